@@ -1,3 +1,31 @@
-from .hsv7segment import HSV7Segment
-from .is31fl3235a import IS31FL3235A
-from .number_display import NumberDisplay
+"""Support for the Clueboard RGB7Segment display.
+
+Submodules are imported the first time one of their classes is used, so `import rgb7seg` stays fast and tools that only need part of the package don't pay for the rest.
+"""
+_exports = {
+    'Animator': 'animation',
+    'DisplayArray': 'display_array',
+    'HSV7Segment': 'hsv7segment',
+    'IS31FL3235A': 'is31fl3235a',
+    'NumberDisplay': 'number_display',
+    'SimulatedBus': 'bus',
+    'SMBusBackend': 'bus',
+    'Timeline': 'timeline',
+}
+
+__all__ = sorted(_exports)
+
+
+def __getattr__(name):
+    if name not in _exports:
+        raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+    module = __import__('%s.%s' % (__name__, _exports[name]), fromlist=[name])
+    value = getattr(module, name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""asyncio wrappers for HSV7Segment and NumberDisplay.
+
+All bus I/O runs on a single worker thread per bus, so writes to a bus are serialized and never block the event loop.
+"""
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+
+from . import animation
+from .bus import open_bus
+from .hsv7segment import HSV7Segment
+from .number_display import NumberDisplay
+
+# Buses opened by number get a new bus object each time, so they share an executor through their bus_id. Executors
+# are dropped once nothing uses them or their bus, and the worker thread exits with them.
+_executors = weakref.WeakKeyDictionary()            # Buses without a bus_id
+_bus_id_executors = weakref.WeakValueDictionary()  # Buses with a bus_id
+_executors_lock = threading.Lock()
+
+
+def _executor_key(bus):
+    bus_id = getattr(bus, 'bus_id', None)
+    if bus_id is None:
+        return _executors, bus
+
+    return _bus_id_executors, bus_id
+
+
+def bus_executor(bus):
+    """Returns the single threaded executor that runs all I/O for `bus`, and any other bus object for the same physical bus.
+    """
+    executors, key = _executor_key(bus)
+
+    with _executors_lock:
+        executor = executors.get(key)
+        if executor is None:
+            executor = executors[key] = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rgb7seg-i2c')
+
+        return executor
+
+
+async def close_bus(bus):
+    """Close `bus` on its worker thread, then stop the thread. Every display using the bus stops working.
+    """
+    executors, key = _executor_key(bus)
+
+    with _executors_lock:
+        executor = executors.pop(key, None)
+
+    if executor is None:
+        bus.close()
+        return
+
+    await asyncio.get_running_loop().run_in_executor(executor, bus.close)
+    executor.shutdown()
+
+
+class AsyncHSV7Segment(object):
+    """An asyncio interface to an HSV7Segment.
+
+    Create one with `await AsyncHSV7Segment.open(...)`, which takes the same arguments as HSV7Segment. The wrapped HSV7Segment is always buffered, and every change is made on the bus's worker thread.
+    """
+    def __init__(self, hsv7seg):
+        self.hsv7seg = hsv7seg
+        self.executor = bus_executor(hsv7seg.is31fl3235a.i2c_bus)
+
+    @classmethod
+    async def open(cls, i2c_bus=None, **hsv7segment_kwargs):
+        bus = open_bus(i2c_bus)
+        executor = bus_executor(bus)  # Keep it alive until the wrapper holds it
+        hsv7segment_kwargs['buffered'] = True
+        hsv7seg = await asyncio.get_running_loop().run_in_executor(executor, partial(HSV7Segment, i2c_bus=bus, **hsv7segment_kwargs))
+
+        return cls(hsv7seg)
+
+    def _run(self, func, *args):
+        return asyncio.get_running_loop().run_in_executor(self.executor, partial(func, *args))
+
+    def _set(self, segments):
+        for segment, hsv in segments.items():
+            setattr(self.hsv7seg, segment, hsv)
+        self.hsv7seg.update()
+
+    async def set(self, **segments):
+        """Set one or more segments and write them to the IC, eg `await numeral.set(a=[0, 1, 1], g=[0, 1, 1])`.
+        """
+        await self._run(self._set, segments)
+
+    async def update(self):
+        """Write the current state to the IC.
+        """
+        await self._run(self.hsv7seg.update)
+
+    async def close(self):
+        """Close the bus and stop its worker thread, see `close_bus()`.
+        """
+        await close_bus(self.hsv7seg.is31fl3235a.i2c_bus)
+
+
+class AsyncNumberDisplay(object):
+    """An asyncio interface to a NumberDisplay.
+
+    Create one with `await AsyncNumberDisplay.open(...)`, which takes the same arguments as NumberDisplay, or wrap an existing NumberDisplay.
+    """
+    def __init__(self, number_display):
+        self.number_display = number_display
+        self.executor = bus_executor(number_display.hsv7seg.is31fl3235a.i2c_bus)
+
+    @classmethod
+    async def open(cls, i2c_bus=None, **number_display_kwargs):
+        bus = open_bus(i2c_bus)
+        executor = bus_executor(bus)  # Keep it alive until the wrapper holds it
+        number_display = await asyncio.get_running_loop().run_in_executor(executor, partial(NumberDisplay, i2c_bus=bus, **number_display_kwargs))
+
+        return cls(number_display)
+
+    @property
+    def colors(self):
+        return self.number_display.colors
+
+    @property
+    def color(self):
+        return self.number_display.color
+
+    def _run(self, func, *args):
+        return asyncio.get_running_loop().run_in_executor(self.executor, partial(func, *args))
+
+    async def update(self):
+        await self._run(self.number_display.update)
+
+    async def set_color(self, color):
+        await self._run(self.number_display.set_color, color)
+
+    async def display(self, character='', color=None):
+        await self._run(self.number_display.display, character, color)
+
+    async def close(self):
+        """Close the bus and stop its worker thread, see `close_bus()`.
+        """
+        await close_bus(self.number_display.hsv7seg.is31fl3235a.i2c_bus)
+
+    async def animate(self, effect, fps=30):
+        """Play `effect` at `fps` frames per second, returning once it ends.
+
+        Like `Animator`, frames are scheduled against deadlines and frames whose deadlines have passed are skipped, except the last one. Returns the number of skipped frames. Cancel the task to stop an effect that never ends.
+        """
+        loop = asyncio.get_running_loop()
+        interval = 1.0 / fps
+        deadline = loop.time()
+        frames = iter(effect)
+        dropped = 0
+        skipped = None  # The last color skipped since one was shown
+
+        for color in frames:
+            skipped = None
+            await self.set_color(color)
+
+            deadline += interval
+            now = loop.time()
+            if now < deadline:
+                await asyncio.sleep(deadline - now)
+                continue
+
+            missed = int((now - deadline) / interval)
+            for skipped in islice(frames, missed):
+                dropped += 1
+            deadline += missed * interval
+
+        # The effect ended while we were catching up, it should still end on its last frame
+        if skipped is not None:
+            await self.set_color(skipped)
+            dropped -= 1
+
+        return dropped
+
+    async def breathing(self, fps=30):
+        """Fade the current character in and out forever, picking a new random color after each breath.
+        """
+        await self.animate(animation.breathing(self.color, fps), fps)
+
+    async def fade(self, color, duration=1.0, fps=30):
+        """Fade from the current color to `color` over `duration` seconds.
+        """
+        return await self.animate(animation.fade(self.color, color, duration, fps), fps)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+
+import random
+import threading
+from itertools import islice
+from time import monotonic
+
+_NO_FRAME = object()
+
+
+class Animator(object):
+    """Runs an effect on a background thread at a fixed frame rate.
+
+    An effect is any iterable that yields one frame per step. Each frame is passed to `apply`, which defaults to `display.set_color`, so the effects in this module yield (hue, saturation, value) colors.
+
+    Frames are scheduled against monotonic deadlines. When a frame takes longer than its slot the frames whose deadlines have already passed are skipped and counted in `self.dropped_frames`, so effects keep their speed no matter how slow the bus is. The last frame of an effect that ends is never skipped.
+    """
+    def __init__(self, display, fps=30, apply=None):
+        """Setup the animator.
+
+        Options:
+
+            display
+                The NumberDisplay (or DisplayArray) to animate.
+
+            fps
+                The target frame rate.
+
+            apply
+                A function called with each frame. Defaults to `display.set_color`.
+        """
+        self.display = display
+        self.fps = fps
+        self.apply = apply or display.set_color
+        self.frames = 0
+        self.dropped_frames = 0
+        self.error = None
+        self._thread = None
+        self._stop = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, effect):
+        """Start running `effect`, replacing the effect that is currently running.
+        """
+        self.stop()
+
+        self.frames = 0
+        self.dropped_frames = 0
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(iter(effect), self._stop), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the running effect and wait for its thread to exit.
+        """
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def wait(self, timeout=None):
+        """Block until the running effect finishes or `timeout` seconds have passed.
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self, frames, stop):
+        interval = 1.0 / self.fps
+        deadline = monotonic()
+        skipped = _NO_FRAME  # The last frame skipped since a frame was applied
+
+        try:
+            while not stop.is_set():
+                try:
+                    frame = next(frames)
+                except StopIteration:
+                    # The effect ended while we were catching up, it should still end on its last frame
+                    if skipped is not _NO_FRAME:
+                        self.apply(skipped)
+                        self.frames += 1
+                        self.dropped_frames -= 1
+                    break
+
+                skipped = _NO_FRAME
+                self.apply(frame)
+                self.frames += 1
+                deadline += interval
+                now = monotonic()
+
+                if now < deadline:
+                    stop.wait(deadline - now)
+                    continue
+
+                # We're running late, skip the frames whose slots have already passed
+                missed = int((now - deadline) / interval)
+                for skipped in islice(frames, missed):
+                    self.dropped_frames += 1
+                deadline += missed * interval
+
+        except Exception as e:
+            self.error = e
+            raise
+
+
+def breathing(color, fps=30, rise_time=1.0, fall_time=1.0, top_pause=0.2, bottom_pause=0.4, random_colors=True):
+    """An LED breathing effect that fades `color` in and out forever.
+
+    When `random_colors` is True a new random hue and saturation is picked after every breath.
+    """
+    hue, saturation = color[0], color[1]
+    rise_frames = max(int(rise_time * fps), 1)
+    fall_frames = max(int(fall_time * fps), 1)
+
+    while True:
+        for i in range(rise_frames + 1):
+            yield (hue, saturation, i / float(rise_frames))
+
+        for i in range(int(top_pause * fps)):
+            yield (hue, saturation, 1.0)
+
+        for i in range(fall_frames, -1, -1):
+            yield (hue, saturation, i / float(fall_frames))
+
+        for i in range(int(bottom_pause * fps)):
+            yield (hue, saturation, 0.0)
+
+        if random_colors:
+            hue, saturation = random.random(), random.random()
+
+
+def fade(start, end, duration=1.0, fps=30):
+    """Fade from the `start` color to the `end` color over `duration` seconds.
+    """
+    steps = max(int(duration * fps), 1)
+
+    for i in range(steps + 1):
+        x = i / float(steps)
+        yield tuple(a + (b - a) * x for a, b in zip(start, end))
+
+
+def color_cycle(saturation=1, value=0.5, period=5.0, fps=30):
+    """Cycle through every hue once per `period` seconds, forever.
+    """
+    steps = max(int(period * fps), 1)
+
+    while True:
+        for i in range(steps):
+            yield (i / float(steps), saturation, value)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Convert whole animations from HSV to PWM register frames at once.
+
+When NumPy is installed the conversion is vectorised, otherwise it falls back to converting one color at a time with `ColorConverter`. Both produce the same values as `HSV7Segment.render()`.
+"""
+from .color import ColorConverter
+from .hsv7segment import SEGMENT_LEDS
+from .is31fl3235a import FRAME_SIZE
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def hsv_to_registers(hsv, gamma_correction=(2.5, 2.4, 2.4), resolution=1024, use_numpy=None):
+    """Convert HSV colors for many frames into PWM register frames.
+
+    Options:
+
+        hsv
+            A (frames x segments x 3) array of HSV colors between 0 and 1. Segments are in segment mask bit order (A, B, C, D, E, F, G, DP), up to 8 of them.
+
+        gamma_correction
+            A tuple describing gamma correction factors for each channel. Format: (R, G, B)
+
+        resolution
+            How many steps each RGB channel is quantized to before gamma correction, see `ColorConverter`.
+
+        use_numpy
+            Whether to use NumPy. Defaults to using it when it is installed.
+
+    With NumPy this returns a (frames x 28) `uint8` array, otherwise a list of 28 byte `bytes` frames. Either way `bytes(frame)` is the frame's registers ready to send, and the result can be passed to `Timeline.from_registers()` or a frame to `FrameBuffer.set_frame()` as is. `IS31FL3235A.write_frame()` and `write_register()` take a list, so use `list(frame)` there.
+    """
+    if use_numpy is None:
+        use_numpy = numpy is not None
+
+    converter = ColorConverter(gamma_correction, resolution)
+
+    if use_numpy:
+        if numpy is None:
+            raise RuntimeError('NumPy is not installed!')
+
+        return _hsv_to_registers_numpy(hsv, converter)
+
+    return _hsv_to_registers_python(hsv, converter)
+
+
+def _hsv_to_registers_python(hsv, converter):
+    hsv2pwm = converter.hsv2pwm
+    frames = []
+
+    for frame in hsv:
+        if len(frame) > len(SEGMENT_LEDS):
+            raise ValueError('A frame can have at most %s segments!' % len(SEGMENT_LEDS))
+
+        registers = bytearray(FRAME_SIZE)
+        for color, leds in zip(frame, SEGMENT_LEDS):
+            for value, led in zip(hsv2pwm(color), leds):
+                registers[led - 1] = value
+        frames.append(bytes(registers))
+
+    return frames
+
+
+def _hsv_to_registers_numpy(hsv, converter):
+    hsv = numpy.asarray(hsv, dtype=numpy.float64)
+
+    if hsv.ndim != 3 or hsv.shape[2] != 3 or hsv.shape[1] > len(SEGMENT_LEDS):
+        raise ValueError('hsv must be a (frames x segments x 3) array with at most %s segments! (%s)' % (len(SEGMENT_LEDS), hsv.shape))
+
+    h, s, v = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+
+    # The same math as colorsys.hsv_to_rgb(), so both paths agree exactly
+    i = numpy.floor(h * 6.0)
+    f = (h * 6.0) - i
+    p = v * (1.0 - s)
+    q = v * (1.0 - s * f)
+    t = v * (1.0 - s * (1.0 - f))
+    i = i.astype(numpy.intp) % 6
+
+    red = numpy.choose(i, (v, q, p, p, t, v))
+    green = numpy.choose(i, (t, v, v, q, p, p))
+    blue = numpy.choose(i, (p, p, t, v, v, q))
+
+    tables = numpy.array(converter.tables, dtype=numpy.uint8)
+    registers = numpy.zeros((hsv.shape[0], FRAME_SIZE), dtype=numpy.uint8)
+    leds = numpy.array(SEGMENT_LEDS[:hsv.shape[1]], dtype=numpy.intp) - 1
+
+    for channel, rgb in enumerate((red, green, blue)):
+        if rgb.size and (rgb.min() < 0 or rgb.max() > 1):
+            raise ValueError('HSV values must be between 0 and 1!')
+
+        quantized = (rgb * converter.resolution + 0.5).astype(numpy.intp)
+        registers[:, leds[:, channel]] = tables[channel][quantized]
+
+    return registers
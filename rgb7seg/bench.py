@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""Benchmarks for the rgb7seg display pipeline.
+
+Every scenario runs against a SimulatedBus, so no hardware is needed. Run it with:
+
+    python3 -m rgb7seg.bench [--iterations N] [--speed HZ] [--output FILE] [scenario ...]
+
+Results are written as JSON so they can be compared between releases.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from time import perf_counter, process_time
+
+from . import animation
+from .bus import FAST_MODE, SimulatedBus
+from .display_array import DisplayArray
+from .hsv7segment import HSV7Segment
+from .number_display import HTML_COLORS, NumberDisplay
+
+# How long `from rgb7seg import NumberDisplay` may take, in milliseconds, not counting interpreter startup
+IMPORT_BUDGET_MS = 25
+IMPORT_RUNS = 10
+
+
+class StageTimer(object):
+    """Accumulates the time spent in instrumented methods.
+
+    Times are inclusive, so a stage that calls another instrumented stage includes its time.
+    """
+    def __init__(self):
+        self.totals = {}
+        self.calls = {}
+
+    def wrap(self, obj, method, name):
+        """Replace `obj.method` with a version that records its time under `name`.
+        """
+        original = getattr(obj, method)
+        self.totals.setdefault(name, 0.0)
+        self.calls.setdefault(name, 0)
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.totals[name] += perf_counter() - start
+                self.calls[name] += 1
+
+        setattr(obj, method, timed)
+
+    def instrument(self, numeral):
+        """Instrument the stages of a NumberDisplay.
+        """
+        self.wrap(numeral.hsv7seg, 'render', 'hsv7segment.render')
+        self.wrap(numeral.hsv7seg.is31fl3235a, 'update', 'is31fl3235a.update')
+        self.wrap(numeral.hsv7seg.is31fl3235a, 'write_register', 'is31fl3235a.write_register')
+        self.wrap(numeral.hsv7seg.is31fl3235a, 'write_messages', 'is31fl3235a.write_messages')
+
+    def reset(self):
+        for name in self.totals:
+            self.totals[name] = 0.0
+            self.calls[name] = 0
+
+
+def run_scenario(name, bus, timer, frame, iterations):
+    """Call `frame(i)` `iterations` times and return the measurements.
+    """
+    bus.reset_counters()
+    timer.reset()
+
+    start, start_cpu = perf_counter(), process_time()
+    for i in range(iterations):
+        frame(i)
+    elapsed, cpu = perf_counter() - start, process_time() - start_cpu
+
+    return {
+        'scenario': name,
+        'iterations': iterations,
+        'frames_per_second': iterations / elapsed,
+        'cpu_us_per_frame': cpu / iterations * 1e6,
+        'stages_us_per_frame': {stage: total / iterations * 1e6 for stage, total in timer.totals.items()},
+        'stage_calls_per_frame': {stage: calls / float(iterations) for stage, calls in timer.calls.items()},
+        'i2c_transactions_per_frame': bus.transactions / float(iterations),
+        'i2c_bytes_per_frame': bus.bytes_written / float(iterations),
+        'i2c_bus_us_per_frame': bus.elapsed / iterations * 1e6,
+    }
+
+
+def bench_display_char(bus, timer, iterations):
+    """Display a different character every frame.
+    """
+    numeral = NumberDisplay(i2c_bus=bus, ic_address=0x3F)
+    timer.instrument(numeral)
+    characters = '0123456789ABCDEF'
+    color = HTML_COLORS['red']
+
+    return run_scenario('display_char', bus, timer, lambda i: numeral.display(characters[i % len(characters)], color), iterations)
+
+
+def bench_display_same(bus, timer, iterations):
+    """Display the same character every frame.
+    """
+    numeral = NumberDisplay(i2c_bus=bus, ic_address=0x3F)
+    timer.instrument(numeral)
+    color = HTML_COLORS['red']
+
+    return run_scenario('display_same', bus, timer, lambda i: numeral.display(8, color), iterations)
+
+
+def bench_color_fade(bus, timer, iterations):
+    """Fade a character between two colors with `set_color()`.
+    """
+    numeral = NumberDisplay(i2c_bus=bus, ic_address=0x3F)
+    numeral.display(8)
+    timer.instrument(numeral)
+    colors = list(animation.fade((0, 1, 0), (0.66666666, 1, 1), duration=1, fps=99))
+
+    return run_scenario('color_fade', bus, timer, lambda i: numeral.set_color(colors[i % len(colors)]), iterations)
+
+
+def bench_countdown(bus, timer, iterations):
+    """Count down from 9 to 0 in progressively worrying colors, like rgb7seg_countdown.
+    """
+    numeral = NumberDisplay(i2c_bus=bus, ic_address=0x3F)
+    timer.instrument(numeral)
+
+    def frame(i):
+        value = 9 - i % 10
+        if value > 6:
+            numeral.display(value, numeral.colors['green'])
+        elif value > 3:
+            numeral.display(value, numeral.colors['yellow'])
+        else:
+            numeral.display(value, numeral.colors['red'])
+
+    return run_scenario('countdown', bus, timer, frame, iterations)
+
+
+def bench_segment_setters(bus, timer, iterations):
+    """Set all 8 segments of an unbuffered HSV7Segment one at a time.
+    """
+    hsv7seg = HSV7Segment(i2c_bus=bus, ic_address=0x3F)
+    timer.wrap(hsv7seg, 'render', 'hsv7segment.render')
+    timer.wrap(hsv7seg.is31fl3235a, 'update', 'is31fl3235a.update')
+    timer.wrap(hsv7seg.is31fl3235a, 'write_register', 'is31fl3235a.write_register')
+    timer.wrap(hsv7seg.is31fl3235a, 'write_messages', 'is31fl3235a.write_messages')
+    colors = [[0, 1, 1], [0.5, 1, 1]]
+
+    def frame(i):
+        color = colors[i % 2]
+        hsv7seg.a = color
+        hsv7seg.b = color
+        hsv7seg.c = color
+        hsv7seg.d = color
+        hsv7seg.e = color
+        hsv7seg.f = color
+        hsv7seg.g = color
+        hsv7seg.dp = color
+
+    return run_scenario('segment_setters', bus, timer, frame, iterations)
+
+
+def bench_segment_frame(bus, timer, iterations):
+    """Set all 8 segments of an unbuffered HSV7Segment inside a single `frame()`.
+    """
+    hsv7seg = HSV7Segment(i2c_bus=bus, ic_address=0x3F)
+    timer.wrap(hsv7seg, 'render', 'hsv7segment.render')
+    timer.wrap(hsv7seg.is31fl3235a, 'update', 'is31fl3235a.update')
+    timer.wrap(hsv7seg.is31fl3235a, 'write_register', 'is31fl3235a.write_register')
+    timer.wrap(hsv7seg.is31fl3235a, 'write_messages', 'is31fl3235a.write_messages')
+    colors = [[0, 1, 1], [0.5, 1, 1]]
+
+    def frame(i):
+        color = colors[i % 2]
+        with hsv7seg.frame():
+            hsv7seg.a = color
+            hsv7seg.b = color
+            hsv7seg.c = color
+            hsv7seg.d = color
+            hsv7seg.e = color
+            hsv7seg.f = color
+            hsv7seg.g = color
+            hsv7seg.dp = color
+
+    return run_scenario('segment_frame', bus, timer, frame, iterations)
+
+
+def bench_multi_numeral(bus, timer, iterations):
+    """Count on a 4 digit DisplayArray.
+    """
+    array = DisplayArray(i2c_bus=bus)
+    for numeral in array:
+        timer.instrument(numeral)
+    color = HTML_COLORS['blue']
+
+    return run_scenario('multi_numeral', bus, timer, lambda i: array.display(i % 10000, color), iterations)
+
+
+def bench_import(bus, timer, iterations):
+    """Time `from rgb7seg import NumberDisplay` in a fresh interpreter.
+
+    The interpreter's own startup time is measured separately and subtracted. The fastest of `IMPORT_RUNS` runs is used, since it is the least affected by other activity on the machine.
+    """
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    def fastest(code):
+        times = []
+        for i in range(IMPORT_RUNS):
+            start = perf_counter()
+            subprocess.check_call([sys.executable, '-c', code], env=env)
+            times.append(perf_counter() - start)
+        return min(times)
+
+    startup = fastest('pass')
+    import_ms = max(fastest('from rgb7seg import NumberDisplay') - startup, 0) * 1000
+
+    return {
+        'scenario': 'import',
+        'iterations': IMPORT_RUNS,
+        'interpreter_startup_ms': startup * 1000,
+        'import_ms': import_ms,
+        'import_budget_ms': IMPORT_BUDGET_MS,
+        'within_budget': import_ms <= IMPORT_BUDGET_MS,
+    }
+
+
+SCENARIOS = {
+    'display_char': bench_display_char,
+    'display_same': bench_display_same,
+    'color_fade': bench_color_fade,
+    'countdown': bench_countdown,
+    'segment_setters': bench_segment_setters,
+    'segment_frame': bench_segment_frame,
+    'multi_numeral': bench_multi_numeral,
+    'import': bench_import,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m rgb7seg.bench', description='Benchmark the rgb7seg display pipeline on a simulated bus.')
+    parser.add_argument('scenarios', nargs='*', metavar='scenario', help='Scenarios to run (default: all). Choices: %s' % ', '.join(sorted(SCENARIOS)))
+    parser.add_argument('-n', '--iterations', type=int, default=1000, help='Frames to run for each scenario (default: %(default)s)')
+    parser.add_argument('-s', '--speed', type=int, default=FAST_MODE, help='Bus speed in Hz used to model bus time (default: %(default)s)')
+    parser.add_argument('--separate', action='store_true', help='Model a bus without combined transactions, so the PWM writes and the flush are sent separately')
+    parser.add_argument('-o', '--output', help='Write the JSON results to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error('unknown scenario %r' % name)
+
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'bus_speed': args.speed,
+        'combined': not args.separate,
+        'results': [],
+    }
+
+    for name in args.scenarios or sorted(SCENARIOS):
+        bus = SimulatedBus(speed=args.speed, combined=not args.separate)
+        results['results'].append(SCENARIOS[name](bus, StageTimer(), args.iterations))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    else:
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
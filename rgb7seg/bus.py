@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+
+import errno
+import time
+
+# Common i2c bus speeds, in Hz
+STANDARD_MODE = 100000
+FAST_MODE = 400000
+FAST_MODE_PLUS = 1000000
+
+# The most messages the kernel accepts in one I2C_RDWR transaction
+I2C_RDWR_MAX_MESSAGES = 42
+
+
+def open_bus(i2c_bus=None):
+    """Returns an SMBusBackend for the bus number `i2c_bus`, or `i2c_bus` itself if it is already a bus object.
+    """
+    if i2c_bus is None or isinstance(i2c_bus, int):
+        return SMBusBackend(1 if i2c_bus is None else i2c_bus)
+
+    return i2c_bus
+
+
+class I2CBus(object):
+    """The interface rgb7seg uses to talk to an i2c bus.
+
+    This mirrors the subset of `smbus.SMBus` used by the IS31FL3235A class, so an `SMBus` instance can be used anywhere an I2CBus is expected.
+
+    `bus_id` identifies the physical bus for `StateCache`. It is None for buses that don't outlive the process.
+
+    `combined` is True when `write_messages()` sends all its messages in a single transaction. Otherwise it falls back to one transaction per message.
+    """
+    bus_id = None
+    combined = False
+
+    def write_byte_data(self, address, register, value):
+        """Write a single byte to `register` on the device at `address`.
+        """
+        raise NotImplementedError
+
+    def write_i2c_block_data(self, address, register, values):
+        """Write a list of up to 32 bytes starting at `register` on the device at `address`.
+        """
+        raise NotImplementedError
+
+    def write_messages(self, messages):
+        """Write a list of `(address, register, values)` messages, in order.
+
+        When `self.combined` is True the messages are sent as one transaction, joined by repeated starts, so the bus is only claimed once and there is no 32 byte limit on `values`.
+        """
+        for address, register, values in messages:
+            if len(values) == 1:
+                self.write_byte_data(address, register, values[0])
+            else:
+                self.write_i2c_block_data(address, register, values)
+
+    def close(self):
+        pass
+
+
+class SMBusBackend(I2CBus):
+    """A real i2c bus, accessed through the `smbus2` module, or `smbus` if smbus2 is not installed.
+
+    With smbus2 `write_messages()` uses the I2C_RDWR ioctl to send all its messages in one combined transaction.
+    """
+    def __init__(self, bus=1):
+        try:
+            from smbus2 import SMBus, i2c_msg
+        except ImportError:
+            from smbus import SMBus
+            i2c_msg = None
+
+        self.bus = bus
+        self.bus_id = bus
+        self.smbus = SMBus(bus)
+        self.i2c_msg = i2c_msg
+        self.combined = i2c_msg is not None
+
+        # Call straight into smbus, we don't want an extra python call on every write
+        self.write_byte_data = self.smbus.write_byte_data
+        self.write_i2c_block_data = self.smbus.write_i2c_block_data
+
+    def write_messages(self, messages):
+        if not self.combined:
+            return I2CBus.write_messages(self, messages)
+
+        write = self.i2c_msg.write
+        messages = [write(address, [register] + list(values)) for address, register, values in messages]
+
+        for i in range(0, len(messages), I2C_RDWR_MAX_MESSAGES):
+            self.smbus.i2c_rdwr(*messages[i:i + I2C_RDWR_MAX_MESSAGES])
+
+    def close(self):
+        self.smbus.close()
+
+
+class SimulatedIS31FL3235A(object):
+    """An in-memory model of the IS31FL3235A register file.
+
+    Writes to the PWM and LED control registers are held until the update register is written, like on the real IC. Writing the reset register restores every register to its default value.
+    """
+    register_count = 0x50
+    shutdown_register = 0x00
+    pwm_register_start = 0x05
+    pwm_update_register = 0x25
+    led_register_start = 0x2A
+    global_control_register = 0x4A
+    reset_register = 0x4F
+    led_count = 28
+
+    def __init__(self):
+        self.resets = 0
+        self.reset()
+
+    def reset(self):
+        """Restore every register to its power on value.
+        """
+        self.registers = bytearray(self.register_count)
+        self.live_pwm = bytearray(self.led_count)
+        self.live_led_control = bytearray(self.led_count)
+        self.flushes = 0
+
+    def write(self, register, data):
+        """Write `data` starting at `register`, auto-incrementing the register after each byte.
+        """
+        for value in data:
+            if register >= self.register_count:
+                raise IOError(errno.EIO, 'Register 0x%02X does not exist!' % register)
+
+            if register == self.reset_register:
+                self.resets += 1
+                self.reset()
+            else:
+                self.registers[register] = value & 0xFF
+                if register == self.pwm_update_register:
+                    self.latch()
+
+            register += 1
+
+    def latch(self):
+        """Make the PWM and LED control registers live.
+        """
+        self.live_pwm[:] = self.registers[self.pwm_register_start:self.pwm_register_start + self.led_count]
+        self.live_led_control[:] = self.registers[self.led_register_start:self.led_register_start + self.led_count]
+        self.flushes += 1
+
+    @property
+    def shutdown(self):
+        """True when the IC is in software shutdown.
+        """
+        return not self.registers[self.shutdown_register] & 1
+
+    @property
+    def global_off(self):
+        """True when all LEDs have been turned off by the global control register.
+        """
+        return bool(self.registers[self.global_control_register] & 1)
+
+    @property
+    def pwm(self):
+        """The live PWM value for OUT1-OUT28.
+        """
+        return list(self.live_pwm)
+
+    def outputs(self):
+        """The brightness each LED is actually showing, taking shutdown, global control and LED control into account.
+        """
+        if self.shutdown or self.global_off:
+            return [0] * self.led_count
+
+        return [pwm if control & 1 else 0 for pwm, control in zip(self.live_pwm, self.live_led_control)]
+
+
+class SimulatedBus(I2CBus):
+    """An i2c bus with simulated IS31FL3235A ICs attached.
+
+    Every write is counted in `self.transactions` and `self.bytes_written`. A `write_messages()` call counts as a single transaction, like an I2C_RDWR transaction on a real bus. When `speed` is set the time each transaction would take on a real bus is added to `self.elapsed`, and when `sleep` is also True we actually wait that long so throughput matches real hardware.
+    """
+    def __init__(self, addresses=(0x3C, 0x3D, 0x3E, 0x3F), speed=None, sleep=False, combined=True):
+        """Setup the simulated bus.
+
+        Options:
+
+            addresses
+                The addresses of the simulated IS31FL3235A ICs.
+
+            speed
+                The bus clock in Hz, for example `FAST_MODE`. When None no timing is modelled.
+
+            sleep
+                When True writes take as long as they would on a real bus running at `speed`.
+
+            combined
+                When False the bus behaves like one without I2C_RDWR support, and `write_messages()` sends each message on its own.
+        """
+        self.devices = {address: SimulatedIS31FL3235A() for address in addresses}
+        self.speed = speed
+        self.sleep = sleep
+        self.combined = combined
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.transactions = 0
+        self.bytes_written = 0
+        self.elapsed = 0.0
+
+    def transaction_time(self, nbytes):
+        """How long a write of `nbytes` (including the address byte) takes at `self.speed`.
+
+        Each byte is 8 bits plus an ACK, and the start and stop conditions cost about a bit each.
+        """
+        return (nbytes * 9 + 2) / float(self.speed)
+
+    def write_byte_data(self, address, register, value):
+        self._transfer(address, register, (value,))
+
+    def write_i2c_block_data(self, address, register, values):
+        if not 0 < len(values) <= 32:
+            raise ValueError('Block writes must be between 1 and 32 bytes! (%s)' % len(values))
+
+        self._transfer(address, register, values)
+
+    def write_messages(self, messages):
+        if not self.combined:
+            return I2CBus.write_messages(self, messages)
+
+        # Every message after the first starts with a repeated start and the address byte
+        nbytes = sum(len(values) + 2 for address, register, values in messages)
+        self._count(nbytes)
+
+        for address, register, values in messages:
+            self._device(address).write(register, values)
+
+    def _count(self, nbytes):
+        self.transactions += 1
+        self.bytes_written += nbytes
+
+        if self.speed:
+            duration = self.transaction_time(nbytes)
+            self.elapsed += duration
+            if self.sleep:
+                time.sleep(duration)
+
+    def _device(self, address):
+        if address not in self.devices:
+            raise IOError(errno.EREMOTEIO, 'No device at address 0x%02X!' % address)
+
+        return self.devices[address]
+
+    def _transfer(self, address, register, data):
+        self._count(len(data) + 2)  # Address and register bytes
+        self._device(address).write(register, data)
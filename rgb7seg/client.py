@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+import socket
+
+from .daemon import CHARACTER, CMD_CHARACTER, CMD_COLOR, CMD_FRAME, COLOR_SCALE, DEFAULT_SOCKET, FRAME_SIZE, HEADER, pack_color
+from .number_display import HTML_COLORS, check_color
+
+
+class NumberDisplayClient(object):
+    """Drives a numeral owned by an `rgb7seg.daemon`, with the same API as NumberDisplay.
+
+    Several programs can use the same numerals at once, and none of them need access to the i2c bus. Calls send a few bytes to the daemon and return without waiting for the bus.
+    """
+    def __init__(self, ic_address=None, socket_path=DEFAULT_SOCKET, colors=HTML_COLORS):
+        """Connect to the daemon.
+
+        Options:
+
+            ic_address
+                The i2c address of the numeral to drive. Defaults to 0x3F.
+
+            socket_path
+                The daemon's Unix socket.
+        """
+        self.ic_address = ic_address or 0x3F
+        self.socket_path = socket_path
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(socket_path)
+
+        self.character = ''
+        self.dp = False
+        self.color = colors['white']
+        self.colors = colors
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def send(self, command, payload):
+        self.socket.sendall(HEADER.pack(command, self.ic_address, len(payload)) + payload)
+
+    def update(self):
+        character = str(self.character)
+        character = character.encode('ascii', 'replace') if len(character) == 1 else b''
+        hue, saturation, value = (int(channel * COLOR_SCALE + 0.5) for channel in self.color)
+
+        self.send(CMD_CHARACTER, CHARACTER.pack(hue, saturation, value, self.dp) + character)
+
+    def set_color(self, color):
+        check_color(color)
+        self.color = color
+        self.send(CMD_COLOR, pack_color(color))
+
+    def set_character(self, character='', dp=False):
+        """Select the character to display without sending it to the daemon.
+        """
+        self.character = character
+        self.dp = dp
+
+    def display(self, character='', color=None):
+        if color:
+            check_color(color)
+            self.color = color
+
+        self.set_character(character)
+        self.update()
+
+    def write_frame(self, values):
+        """Send a list of 28 PWM values to be written to the IC as they are.
+        """
+        if len(values) != FRAME_SIZE:
+            raise ValueError('Frames must be %s values!' % FRAME_SIZE)
+
+        self.send(CMD_FRAME, bytes(values))
+
+    def close(self):
+        self.socket.close()
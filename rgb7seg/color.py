@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+from colorsys import hsv_to_rgb
+
+
+class ColorConverter(object):
+    """Converts HSV colors into gamma corrected PWM values.
+
+    After HSV to RGB conversion each channel is quantized to `resolution` steps and looked up in a per-channel table of gamma corrected PWM values. The tables are built once, so converting a color costs a single `hsv_to_rgb()` and three list lookups. Recently converted colors are remembered, so repeated colors skip even that.
+    """
+    def __init__(self, gamma_correction=(2.5, 2.4, 2.4), resolution=1024, cache_size=1024):
+        """Setup the lookup tables.
+
+        Options:
+
+            gamma_correction
+                A tuple describing gamma correction factors for each channel. Format: (R, G, B)
+
+            resolution
+                How many steps each RGB channel (0-1) is quantized to before gamma correction.
+
+            cache_size
+                How many converted colors to remember.
+        """
+        self.resolution = resolution
+        self.cache_size = cache_size
+        self.cache = {}
+        self.gamma_correction = gamma_correction
+
+    @property
+    def gamma_correction(self):
+        return self._gamma_correction
+
+    @gamma_correction.setter
+    def gamma_correction(self, value):
+        if len(value) != 3:
+            raise ValueError('gamma_correction must be a tuple of 3 values: (R, G, B)')
+
+        self._gamma_correction = tuple(float(gamma) for gamma in value)
+        self.tables = tuple(self.build_table(gamma) for gamma in self._gamma_correction)
+        self.cache.clear()
+
+    def build_table(self, gamma):
+        """Returns a list mapping each quantized channel value to a gamma corrected PWM value (0-255).
+        """
+        resolution = float(self.resolution)
+        return [int((i / resolution) ** gamma * 255.0 + 0.5) for i in range(self.resolution + 1)]
+
+    def hsv2pwm(self, hsv):
+        """Convert an HSV color (0-1) to a tuple of gamma corrected PWM values (0-255).
+        """
+        hsv = tuple(hsv)
+        pwm = self.cache.get(hsv)
+
+        if pwm is None:
+            rgb = hsv_to_rgb(*hsv)
+            for channel in rgb:
+                if not (0 <= channel <= 1):
+                    raise ValueError('HSV values must be between 0 and 1! (%s)' % (hsv,))
+
+            resolution = self.resolution
+            table_r, table_g, table_b = self.tables
+            pwm = (
+                table_r[int(rgb[0] * resolution + 0.5)],  # Add 0.5 so that we round up when needed
+                table_g[int(rgb[1] * resolution + 0.5)],
+                table_b[int(rgb[2] * resolution + 0.5)],
+            )
+
+            if len(self.cache) >= self.cache_size:
+                self.cache.clear()
+            self.cache[hsv] = pwm
+
+        return pwm
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+import threading
+from time import monotonic
+
+
+class Counter(object):
+    """Shows a sequence of values on a display, one per tick, without drifting.
+
+    Ticks are scheduled against absolute monotonic deadlines, so the time spent rendering and writing to the bus is not added to every tick. Each frame is rendered before its deadline and only the bus write happens on the deadline itself. How late each write started is recorded as the tick jitter.
+    """
+    def __init__(self, display, interval=1.0):
+        """Setup the counter.
+
+        Options:
+
+            display
+                The NumberDisplay, DisplayArray or MultiBusController to count on.
+
+            interval
+                The number of seconds between ticks.
+        """
+        self.display = display
+        self.interval = interval
+        self.ticks = 0
+        self.jitter = 0.0
+        self.max_jitter = 0.0
+        self.total_jitter = 0.0
+
+    @property
+    def mean_jitter(self):
+        """The average number of seconds a tick was written after its deadline.
+        """
+        return self.total_jitter / self.ticks if self.ticks else 0.0
+
+    def prepare(self, text, color):
+        """Render `text` in `color` without writing it to the ICs.
+        """
+        display = self.display
+
+        if color:
+            for numeral in getattr(display, 'numerals', [display]):
+                numeral.color = color
+
+        if hasattr(display, 'set_text'):
+            display.set_text(text)
+        else:
+            display.set_character(text)
+
+        display.render()
+
+    def run(self, values, stop=None):
+        """Display each `(text, color)` pair from `values` for one tick. A color of None keeps the current color.
+
+        This blocks until the last value has been shown for a full tick. Pass a `threading.Event` as `stop` to end the count from another thread.
+
+        Returns the number of ticks.
+        """
+        stop = stop or threading.Event()
+        values = iter(values)
+        interval = self.interval
+        self.ticks = 0
+        self.jitter = self.max_jitter = self.total_jitter = 0.0
+
+        try:
+            text, color = next(values)
+        except StopIteration:
+            return 0
+
+        self.prepare(text, color)
+        deadline = monotonic()
+
+        while True:
+            # The next frame is already rendered, so all that is left to do on the deadline is the bus write
+            now = monotonic()
+            if now < deadline:
+                if stop.wait(deadline - now):
+                    break
+                now = monotonic()
+
+            self.display.commit()
+
+            jitter = now - deadline
+            self.jitter = jitter
+            self.max_jitter = max(self.max_jitter, jitter)
+            self.total_jitter += jitter
+            self.ticks += 1
+            deadline += interval
+
+            try:
+                text, color = next(values)
+            except StopIteration:
+                stop.wait(max(deadline - monotonic(), 0))
+                break
+
+            self.prepare(text, color)
+
+        return self.ticks
+
+
+def counting(start, stop, color=None, thresholds=()):
+    """Yields `(value, color)` for every integer from `start` to `stop`, inclusive, counting up or down.
+
+    `thresholds` is a list of `(above, color)` pairs checked in order. A value gets the color of the first pair it is greater than, or `color` when there is none.
+    """
+    step = 1 if stop >= start else -1
+
+    for value in range(start, stop + step, step):
+        for above, threshold_color in thresholds:
+            if value > above:
+                yield value, threshold_color
+                break
+        else:
+            yield value, color
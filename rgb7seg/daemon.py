@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""A daemon that owns the i2c bus and displays frames sent by local clients.
+
+Clients connect to a Unix socket and send messages made of a header followed by a payload:
+
+    header
+        3 bytes: command, IC address, payload length
+
+    CMD_FRAME
+        28 bytes: the PWM values for OUT1-OUT28
+
+    CMD_CHARACTER
+        7 or 8 bytes: hue, saturation, value (uint16, 0-65535 maps to 0-1), decimal point (0/1), then the character (ASCII, omitted for blank)
+
+    CMD_COLOR
+        6 bytes: hue, saturation, value (uint16, 0-65535 maps to 0-1)
+
+All numbers are big endian. Messages are applied in the order they arrive. Everything that arrives together is coalesced into a single frame per IC, written with one flush per IC. See `rgb7seg.client` for a client library.
+
+Run it with:
+
+    python3 -m rgb7seg.daemon --address 0x3C --address 0x3D
+"""
+import argparse
+import errno
+import os
+import selectors
+import socket
+import struct
+
+from .display_array import DisplayArray
+from .is31fl3235a import FRAME_SIZE
+
+DEFAULT_SOCKET = '/run/rgb7seg.sock'
+
+HEADER = struct.Struct('!BBB')  # command, ic address, payload length
+COLOR = struct.Struct('!HHH')   # hue, saturation, value
+CHARACTER = struct.Struct('!HHHB')  # hue, saturation, value, decimal point, followed by the character
+COLOR_SCALE = 65535.0
+
+CMD_FRAME = 1
+CMD_CHARACTER = 2
+CMD_COLOR = 3
+
+
+def pack_color(color):
+    return COLOR.pack(*(int(channel * COLOR_SCALE + 0.5) for channel in color))
+
+
+def unpack_color(data):
+    return tuple(channel / COLOR_SCALE for channel in COLOR.unpack(data))
+
+
+class DisplayDaemon(object):
+    """Owns the numerals on one i2c bus and displays what clients send over a Unix socket.
+    """
+    def __init__(self, socket_path=DEFAULT_SOCKET, ic_addresses=(0x3F,), i2c_bus=None, **hsv7segment_kwargs):
+        """Setup the numerals and start listening.
+
+        Options:
+
+            socket_path
+                Where to create the Unix socket. A stale socket left at this path is replaced, but if another daemon is listening on it an IOError is raised.
+
+            ic_addresses
+                The i2c addresses of the numerals.
+
+            i2c_bus
+                The raspberry pi i2c bus to use, or a bus object.
+
+        For all other options refer to the HSV7Segment class.
+        """
+        self.socket_path = socket_path
+
+        # Check before touching the ICs, so a running daemon's numerals aren't reset
+        if os.path.exists(socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(socket_path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.unlink(socket_path)  # Left behind by a daemon that is no longer running
+            else:
+                raise IOError(errno.EADDRINUSE, 'Another daemon is listening on %s!' % socket_path)
+            finally:
+                probe.close()
+
+        self.array = DisplayArray(ic_addresses, i2c_bus, **hsv7segment_kwargs)
+        self.numerals = {numeral.hsv7seg.is31fl3235a.ic_address: numeral for numeral in self.array}
+        self.messages = 0
+        self.frames = 0
+        self.errors = 0
+
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(socket_path)
+        self.server.listen()
+        self.server.setblocking(False)
+
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.server, selectors.EVENT_READ)
+
+    def serve_forever(self):
+        try:
+            while True:
+                self.handle_events()
+        finally:
+            self.close()
+
+    def handle_events(self, timeout=None):
+        """Wait for client activity, apply every message that has arrived and write the result.
+        """
+        pending = {}
+
+        for key, mask in self.selector.select(timeout):
+            if key.fileobj is self.server:
+                client, address = self.server.accept()
+                client.setblocking(False)
+                self.selector.register(client, selectors.EVENT_READ, bytearray())
+            else:
+                self.read_client(key.fileobj, key.data, pending)
+
+        if pending:
+            try:
+                self.write(pending)
+            except IOError:
+                # The ICs that weren't written or latched are retried with the next frame
+                self.errors += 1
+
+    def read_client(self, client, buffer, pending):
+        try:
+            data = client.recv(65536)
+        except ConnectionError:
+            data = b''
+
+        if not data:
+            self.selector.unregister(client)
+            client.close()
+            return
+
+        buffer.extend(data)
+        while len(buffer) >= HEADER.size:
+            command, ic_address, length = HEADER.unpack_from(buffer)
+            if len(buffer) < HEADER.size + length:
+                break
+
+            payload = bytes(buffer[HEADER.size:HEADER.size + length])
+            del buffer[:HEADER.size + length]
+            self.messages += 1
+
+            try:
+                self.apply(command, ic_address, payload, pending)
+            except (KeyError, ValueError, struct.error):
+                self.errors += 1
+
+    def apply(self, command, ic_address, payload, pending):
+        """Apply one message to the numeral at `ic_address`.
+
+        `pending` maps each IC address that needs writing to a frame sent by a client, or None when the numeral should be rendered from its character and color.
+        """
+        numeral = self.numerals[ic_address]
+
+        if command == CMD_FRAME:
+            if len(payload) != FRAME_SIZE:
+                raise ValueError('Frames must be %s bytes!' % FRAME_SIZE)
+            pending[ic_address] = list(payload)
+
+        elif command == CMD_CHARACTER:
+            hue, saturation, value, dp = CHARACTER.unpack_from(payload)
+            numeral.color = (hue / COLOR_SCALE, saturation / COLOR_SCALE, value / COLOR_SCALE)
+            numeral.set_character(payload[CHARACTER.size:].decode('ascii', 'replace'), bool(dp))
+            pending[ic_address] = None
+
+        elif command == CMD_COLOR:
+            numeral.color = unpack_color(payload)
+            pending[ic_address] = None
+
+        else:
+            raise ValueError('Unknown command %s!' % command)
+
+    def write(self, pending):
+        """Write one frame to each IC in `pending`, flushing them back to back.
+        """
+        for ic_address, frame in pending.items():
+            numeral = self.numerals[ic_address]
+            if frame is None:
+                numeral.render()
+            else:
+                numeral.hsv7seg.is31fl3235a.leds[1:] = frame
+
+        self.array.commit()
+        self.frames += 1
+
+    def close(self):
+        for key in list(self.selector.get_map().values()):
+            key.fileobj.close()
+        self.selector.close()
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m rgb7seg.daemon', description='Own the i2c bus and display frames sent by local clients.')
+    parser.add_argument('-s', '--socket', default=DEFAULT_SOCKET, help='Unix socket to listen on (default: %(default)s)')
+    parser.add_argument('-b', '--bus', type=int, default=1, help='i2c bus number (default: %(default)s)')
+    parser.add_argument('-a', '--address', action='append', type=lambda address: int(address, 0), help='i2c address of a numeral, can be given more than once (default: 0x3F)')
+    parser.add_argument('--simulate', action='store_true', help='Use a simulated bus instead of real hardware')
+    args = parser.parse_args(argv)
+
+    addresses = args.address or [0x3F]
+    i2c_bus = args.bus
+
+    if args.simulate:
+        from .bus import SimulatedBus
+        i2c_bus = SimulatedBus(addresses)
+
+    DisplayDaemon(args.socket, addresses, i2c_bus).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
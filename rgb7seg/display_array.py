@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+from .bus import open_bus
+from .is31fl3235a import commit_frames, init_new_ics
+from .number_display import HTML_COLORS, NumberDisplay, check_color
+
+
+class DisplayArray(object):
+    """A row of numerals sharing one i2c bus that are updated as a single frame.
+
+    Every numeral's PWM registers are written first and the flushes are sent back to back afterwards, so all the numerals change at (nearly) the same time.
+    """
+    def __init__(self, ic_addresses=(0x3C, 0x3D, 0x3E, 0x3F), i2c_bus=None, colors=HTML_COLORS, **hsv7segment_kwargs):
+        """Setup the numerals.
+
+        Options:
+
+            ic_addresses
+                The i2c addresses of the numerals, from left to right.
+
+            i2c_bus
+                The raspberry pi i2c bus to use, or a bus object. A single bus handle is shared by all the numerals.
+
+            colors
+                A dictionary mapping color names to HSV values.
+
+        For all other options refer to the HSV7Segment class.
+        """
+        self.i2c_bus = open_bus(i2c_bus)
+        self.colors = colors
+        skip_init = hsv7segment_kwargs.pop('skip_init', False)
+        self.numerals = [NumberDisplay(i2c_bus=self.i2c_bus, ic_address=ic_address, colors=colors, skip_init=True, **hsv7segment_kwargs) for ic_address in ic_addresses]
+
+        # Setup all the ICs in one pass, except those attached to from a state cache
+        if not skip_init:
+            init_new_ics([numeral.hsv7seg.is31fl3235a for numeral in self.numerals])
+
+    def __len__(self):
+        return len(self.numerals)
+
+    def __getitem__(self, index):
+        return self.numerals[index]
+
+    def __iter__(self):
+        return iter(self.numerals)
+
+    def split_text(self, text):
+        """Split `text` into a list of `(character, dp)` pairs, one for each numeral.
+
+        A '.' lights the decimal point of the character before it. The result is right aligned, so integers line up like they would on a scoreboard.
+        """
+        cells = []
+
+        for character in str(text):
+            if character == '.':
+                if cells and not cells[-1][1]:
+                    cells[-1] = (cells[-1][0], True)
+                else:
+                    cells.append(('', True))
+            else:
+                cells.append((character, False))
+
+        if len(cells) > len(self.numerals):
+            raise ValueError('%r does not fit on %s numerals!' % (text, len(self.numerals)))
+
+        return [('', False)] * (len(self.numerals) - len(cells)) + cells
+
+    def set_text(self, text=''):
+        """Select the characters to display without writing them to the ICs.
+        """
+        for numeral, (character, dp) in zip(self.numerals, self.split_text(text)):
+            numeral.set_character(character, dp)
+
+    def render(self):
+        """Prepare the PWM values for every numeral without writing them to the ICs.
+        """
+        for numeral in self.numerals:
+            numeral.render()
+
+    def commit(self):
+        """Write the prepared PWM values for every numeral, then make them live together.
+
+        When the bus supports combined transactions the whole frame is sent as one transaction.
+        """
+        is31fl3235as = [numeral.hsv7seg.is31fl3235a for numeral in self.numerals]
+        commit_frames(is31fl3235as, [is31fl3235a.leds[1:] for is31fl3235a in is31fl3235as])
+
+    def update(self):
+        self.render()
+        self.commit()
+
+    def set_color(self, color):
+        check_color(color)
+
+        for numeral in self.numerals:
+            numeral.color = color
+
+        self.update()
+
+    def display(self, text='', color=None):
+        """Display a string or integer across the numerals.
+        """
+        if color:
+            check_color(color)
+            for numeral in self.numerals:
+                numeral.color = color
+
+        self.set_text(text)
+        self.update()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Effects that color each segment on its own, built from generators.
+
+An effect is an iterable of frames. A frame is a tuple of 8 HSV colors, one for each segment in segment mask bit order (A-G, DP), where None means the segment is transparent. Effects are evaluated one frame at a time, so they can run forever without using more memory, and they combine freely:
+
+    show = sequence(
+        fade('8', (0, 1, 0), (0, 1, 0.5), duration=1),
+        crossfade(still(glyph_frame('8', (0, 1, 0.5)), 1), still(glyph_frame('2', (0.5, 1, 0.5)), 3), duration=2),
+        overlay(time_scale(rainbow_chase('8'), 2), blink(still(glyph_frame('', (0, 0, 0.5), dp=True)))),
+    )
+    play(myNumeral, show)
+
+Durations are in seconds at the given `fps`, which should match the rate the effect is played at. Transparent segments are shown turned off.
+"""
+from .glyphs import DP, glyph
+
+SEGMENT_COUNT = 8
+BLANK = (None,) * SEGMENT_COUNT
+
+
+def _frame_count(duration, fps):
+    return max(int(duration * fps), 1)
+
+
+def glyph_frame(character, color, color_off=None, dp=False):
+    """Returns a frame showing `character` in `color`. The other segments are set to `color_off`, which leaves them transparent when None.
+    """
+    mask = glyph(character) | DP if dp else glyph(character)
+
+    return tuple(color if mask >> i & 1 else color_off for i in range(SEGMENT_COUNT))
+
+
+def mix(start, end, x):
+    """Returns the color `x` (0-1) of the way from `start` to `end`.
+
+    Hue takes the short way around the color wheel. When one of the colors is None it is treated as the other color turned off, so a segment fades in or out without changing hue.
+    """
+    if start is None:
+        if end is None:
+            return None
+        start = (end[0], end[1], 0)
+    elif end is None:
+        end = (start[0], start[1], 0)
+
+    hue = end[0] - start[0]
+    if hue > 0.5:
+        hue -= 1
+    elif hue < -0.5:
+        hue += 1
+
+    return ((start[0] + hue * x) % 1.0, start[1] + (end[1] - start[1]) * x, start[2] + (end[2] - start[2]) * x)
+
+
+def still(frame, duration=None, fps=30):
+    """Show `frame` for `duration` seconds, or forever when `duration` is None.
+    """
+    if duration is None:
+        while True:
+            yield frame
+
+    for i in range(_frame_count(duration, fps)):
+        yield frame
+
+
+def fade(character, start, end, duration=1.0, fps=30):
+    """Show `character`, fading from the `start` color to the `end` color over `duration` seconds.
+    """
+    steps = _frame_count(duration, fps)
+
+    for i in range(steps + 1):
+        yield glyph_frame(character, mix(start, end, i / float(steps)))
+
+
+def rainbow_chase(character='8', saturation=1, value=0.5, period=2.0, fps=30):
+    """Show `character` with its segments spread around the color wheel, chasing each other once every `period` seconds, forever.
+    """
+    mask = glyph(character)
+    lit = [i for i in range(SEGMENT_COUNT) if mask >> i & 1]
+    steps = _frame_count(period, fps)
+
+    while True:
+        for step in range(steps):
+            frame = [None] * SEGMENT_COUNT
+            for n, i in enumerate(lit):
+                frame[i] = ((step / float(steps) + n / float(len(lit))) % 1.0, saturation, value)
+            yield tuple(frame)
+
+
+def blink(effect, on_time=0.5, off_time=0.5, fps=30):
+    """Show `effect` for `on_time` seconds, then blank for `off_time` seconds, until `effect` ends.
+
+    The effect keeps running while blanked, so it stays in time.
+    """
+    on_frames = _frame_count(on_time, fps)
+    period = on_frames + _frame_count(off_time, fps)
+
+    for i, frame in enumerate(effect):
+        yield frame if i % period < on_frames else BLANK
+
+
+def crossfade(start, end, duration=1.0, fps=30):
+    """Blend from the `start` effect to the `end` effect over `duration` seconds, then carry on with `end`.
+
+    Both effects run during the blend, and its last frame is all `end`, so an `end` that is `duration` long finishes at full strength. If `start` ends first it is treated as blank.
+    """
+    start, end = iter(start), iter(end)
+    steps = _frame_count(duration, fps)
+    last = steps - 1
+
+    for i in range(steps):
+        start_frame = next(start, BLANK)
+        end_frame = next(end, None)
+        if end_frame is None:
+            return
+
+        x = i / float(last) if last else 1.0
+        yield tuple(mix(a, b, x) for a, b in zip(start_frame, end_frame))
+
+    for frame in end:
+        yield frame
+
+
+def overlay(bottom, *tops):
+    """Draw the `tops` effects over the `bottom` effect, later ones on top. Transparent segments show what is below them.
+
+    Runs until `bottom` ends. A top effect that ends first stops being drawn.
+    """
+    tops = [iter(top) for top in tops]
+
+    for frame in bottom:
+        frame = list(frame)
+
+        for top in tops:
+            top_frame = next(top, BLANK)
+            for i, color in enumerate(top_frame):
+                if color is not None:
+                    frame[i] = color
+
+        yield tuple(frame)
+
+
+def sequence(*effects):
+    """Play the effects one after another.
+    """
+    for effect in effects:
+        for frame in effect:
+            yield frame
+
+
+def time_scale(effect, factor):
+    """Play `effect` `factor` times as fast. Frames are skipped when speeding up and repeated when slowing down.
+    """
+    frames = iter(effect)
+    frame = next(frames, None)
+    index = 0
+    position = 0.0
+
+    while frame is not None:
+        yield frame
+
+        position += factor
+        while index < int(position):
+            frame = next(frames, None)
+            if frame is None:
+                return
+            index += 1
+
+
+def play(display, effect, fps=30, block=True):
+    """Play `effect` on `display`, a NumberDisplay or HSV7Segment, at `fps` frames per second.
+
+    Each frame is written with one buffered update. A NumberDisplay gets its frames through `NumberDisplay.set_segments()`, so its lock and writer thread are used. The effect runs on a background thread; when `block` is True this waits until it ends, otherwise the `Animator` running it is returned so you can `stop()` it.
+    """
+    from .animation import Animator
+
+    if hasattr(display, 'hsv7seg'):
+        apply = display.set_segments
+    else:
+        def apply(frame):
+            with display.frame():
+                display.set_segments(frame)
+
+    animator = Animator(display, fps, apply)
+    animator.start(effect)
+
+    if not block:
+        return animator
+
+    animator.wait()
+    if animator.error is not None:
+        raise animator.error
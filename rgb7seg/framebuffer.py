@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""A framebuffer in shared memory, so several processes can draw on the same numerals.
+
+The framebuffer is a file, normally in /dev/shm, holding the PWM register image of each IC:
+
+    header
+        8 bytes: magic (b'R7FB'), version, IC count
+
+    slot, one per IC
+        36 bytes: sequence number (uint32), IC address, 3 reserved bytes, 28 PWM values
+
+All numbers are little endian. Producers map the file and write PWM values straight into their slots with `FrameBuffer.write()`. A single `Flusher` process owns the bus and writes every IC whose sequence number has changed.
+
+The sequence number works as a seqlock: it is odd while a producer is writing the slot and is bumped to the next even number when the frame is complete. The flusher never takes a lock, it skips a slot that is being written and picks it up on its next pass.
+"""
+import fcntl
+import mmap
+import os
+import struct
+import threading
+from time import monotonic
+
+from .bus import open_bus
+from .is31fl3235a import FRAME_SIZE, IS31FL3235A, commit_frames, init_new_ics
+
+MAGIC = b'R7FB'
+VERSION = 1
+HEADER = struct.Struct('<4sBxH')   # magic, version, IC count
+SLOT = struct.Struct('<IB3x28s')  # sequence number, IC address, PWM values
+SEQUENCE = struct.Struct('<I')
+
+
+class FrameBuffer(object):
+    """The PWM register images for several IS31FL3235A ICs, in a memory mapped file.
+    """
+    def __init__(self, path):
+        """Open the framebuffer at `path`, which must have been made by `FrameBuffer.create()`.
+        """
+        self.path = path
+        self.file = open(path, 'r+b')
+        self.mmap = mmap.mmap(self.file.fileno(), 0)
+        self.lock = threading.Lock()  # lockf() only keeps other processes out
+
+        magic, version, count = HEADER.unpack_from(self.mmap)
+        if magic != MAGIC or version != VERSION or len(self.mmap) < HEADER.size + count * SLOT.size:
+            raise ValueError('%s is not an rgb7seg framebuffer!' % path)
+
+        self.addresses = [self.mmap[self.offset(slot) + SEQUENCE.size] for slot in range(count)]
+        self.slots = {address: slot for slot, address in enumerate(self.addresses)}
+
+    @classmethod
+    def create(cls, path, ic_addresses=(0x3F,)):
+        """Create a blank framebuffer at `path` for the ICs at `ic_addresses`, replacing any that is there, and open it.
+        """
+        data = bytearray(HEADER.pack(MAGIC, VERSION, len(ic_addresses)))
+        for address in ic_addresses:
+            data += SLOT.pack(0, address, bytes(FRAME_SIZE))
+
+        # Write the whole file before moving it into place, so nobody maps half a framebuffer
+        temp_path = '%s.%s' % (path, os.getpid())
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.rename(temp_path, path)
+
+        return cls(path)
+
+    def __len__(self):
+        return len(self.addresses)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def offset(self, slot):
+        return HEADER.size + slot * SLOT.size
+
+    def sequence(self, slot):
+        """Returns the sequence number of `slot`.
+        """
+        return SEQUENCE.unpack_from(self.mmap, self.offset(slot))[0]
+
+    def pwm(self, slot):
+        """Returns a writable memoryview of the 28 PWM values in `slot`. Writes through it are not seen by the flusher until the sequence number changes, see `write()`.
+
+        The framebuffer can't be closed while the view is alive, call its `release()` when you are done with it.
+        """
+        start = self.offset(slot) + SLOT.size - FRAME_SIZE
+        return memoryview(self.mmap)[start:start + FRAME_SIZE]
+
+    def write(self, ic_address):
+        """Returns a context manager for drawing on the IC at `ic_address`.
+
+            with framebuffer.write(0x3F) as pwm:
+                pwm[0:3] = bytes((255, 0, 0))
+
+        `pwm` is a memoryview of the slot's PWM values, and is released when the block exits. Producers that write the same slot take turns, and the flusher sees the frame as a whole once the block exits. If the block raises an exception the PWM values are put back the way they were.
+        """
+        return _SlotWriter(self, self.slots[ic_address])
+
+    def set_frame(self, ic_address, values):
+        """Replace all 28 PWM values for the IC at `ic_address`.
+        """
+        with self.write(ic_address) as pwm:
+            pwm[:] = bytes(values)
+
+    def read(self, slot):
+        """Returns `(sequence, pwm_values)` for `slot`, or None when a producer is writing it.
+        """
+        offset = self.offset(slot)
+        sequence = SEQUENCE.unpack_from(self.mmap, offset)[0]
+        if sequence & 1:
+            return None
+
+        pwm = self.mmap[offset + SLOT.size - FRAME_SIZE:offset + SLOT.size]
+        if SEQUENCE.unpack_from(self.mmap, offset)[0] != sequence:
+            return None
+
+        return sequence, pwm
+
+    def close(self):
+        self.mmap.close()
+        self.file.close()
+
+
+class _SlotWriter(object):
+    """Locks a framebuffer slot against other producers and bumps its sequence number around the write.
+    """
+    def __init__(self, framebuffer, slot):
+        self.framebuffer = framebuffer
+        self.slot = slot
+        self.offset = framebuffer.offset(slot)
+
+    def __enter__(self):
+        self.framebuffer.lock.acquire()
+        fcntl.lockf(self.framebuffer.file, fcntl.LOCK_EX, SLOT.size, self.offset)
+        # An odd sequence number here was left by a producer that died mid-write, round it up so the slot is even again when we're done
+        self.sequence = (self.framebuffer.sequence(self.slot) + 1) & ~1
+        SEQUENCE.pack_into(self.framebuffer.mmap, self.offset, (self.sequence + 1) & 0xFFFFFFFF)
+
+        self.view = self.framebuffer.pwm(self.slot)
+        self.saved = bytes(self.view)
+
+        return self.view
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            # Don't publish half a frame, put back what was there. The sequence number still moves on, so a flusher that copied the slot mid-write sees that it changed.
+            self.view[:] = self.saved
+
+        self.view.release()
+        SEQUENCE.pack_into(self.framebuffer.mmap, self.offset, (self.sequence + 2) & 0xFFFFFFFF)
+        fcntl.lockf(self.framebuffer.file, fcntl.LOCK_UN, SLOT.size, self.offset)
+        self.framebuffer.lock.release()
+
+
+class Flusher(object):
+    """Writes the ICs in a FrameBuffer to the i2c bus whenever a producer changes them.
+    """
+    def __init__(self, framebuffer, i2c_bus=None, fps=60, **is31fl3235a_kwargs):
+        """Setup the ICs.
+
+        Options:
+
+            framebuffer
+                The FrameBuffer to read.
+
+            i2c_bus
+                The raspberry pi i2c bus to use, or a bus object. A single bus handle is shared by all the ICs.
+
+            fps
+                How often `run()` checks the framebuffer for changes.
+
+        For all other options refer to the IS31FL3235A class.
+        """
+        self.framebuffer = framebuffer
+        self.fps = fps
+        self.i2c_bus = open_bus(i2c_bus)
+        self.frames = 0
+        self.written = 0
+        self.errors = 0
+        self.sequences = [None] * len(framebuffer)
+
+        skip_init = is31fl3235a_kwargs.pop('skip_init', False)
+        self.is31fl3235as = [IS31FL3235A(ic_address, self.i2c_bus, buffered=True, skip_init=True, **is31fl3235a_kwargs) for ic_address in framebuffer.addresses]
+
+        # Setup all the ICs in one pass, except those attached to from a state cache
+        if not skip_init:
+            init_new_ics(self.is31fl3235as)
+
+    def flush(self):
+        """Write every IC whose sequence number has changed since the last flush, then make them live together.
+
+        Returns the number of ICs that were written.
+        """
+        framebuffer = self.framebuffer
+        changed = []
+        frames = []
+        sequences = []
+
+        for slot, ic in enumerate(self.is31fl3235as):
+            snapshot = framebuffer.read(slot)
+            if snapshot is None or snapshot[0] == self.sequences[slot]:
+                continue
+
+            sequence, pwm = snapshot
+            ic.leds[1:] = pwm
+            changed.append(ic)
+            frames.append(list(pwm))
+            sequences.append((slot, sequence))
+
+        if not changed:
+            return 0
+
+        commit_frames(changed, frames)
+
+        # Only now are the frames on the ICs, if anything failed they are written again on the next pass
+        for slot, sequence in sequences:
+            self.sequences[slot] = sequence
+
+        self.frames += 1
+        self.written += len(changed)
+
+        return len(changed)
+
+    def run(self, stop=None):
+        """Flush changes `self.fps` times a second until `stop`, a `threading.Event`, is set.
+
+        A bus error doesn't stop the loop. It is counted in `self.errors`, and the slots that weren't written are tried again on the next pass.
+        """
+        stop = stop or threading.Event()
+        interval = 1.0 / self.fps
+        deadline = monotonic()
+
+        while not stop.is_set():
+            try:
+                self.flush()
+            except IOError:
+                self.errors += 1
+
+            deadline += interval
+            now = monotonic()
+            if now < deadline:
+                stop.wait(deadline - now)
+            else:
+                # We're running late, start counting again from now rather than trying to catch up
+                deadline = now
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""The characters a numeral can display, stored as 8-bit segment masks.
+
+Bit 0 is segment A through bit 6 for segment G, and bit 7 is the decimal point:
+
+    |--A--|
+    F     B
+    |--G--|
+    E     C
+    |--D--| DP
+"""
+
+SEGMENTS = ('a', 'b', 'c', 'd', 'e', 'f', 'g', 'dp')
+A, B, C, D, E, F, G, DP = (1 << bit for bit in range(8))
+
+CHARACTERS = {
+    '': 0,
+    ' ': 0,
+    '-': G,
+    '_': D,
+    '0': A | B | C | D | E | F,
+    '1': B | C,
+    '2': A | B | D | E | G,
+    '3': A | B | C | D | G,
+    '4': B | C | F | G,
+    '5': A | C | D | F | G,
+    '6': A | C | D | E | F | G,
+    '7': A | B | C,
+    '8': A | B | C | D | E | F | G,
+    '9': A | B | C | D | F | G,
+    'A': A | B | C | E | F | G,
+    'C': A | D | E | F,
+    'E': A | D | E | F | G,
+    'F': A | E | F | G,
+    'H': B | C | E | F | G,
+    'J': B | C | D | E,
+    'L': D | E | F,
+    'P': A | B | E | F | G,
+    'R': A | B | C | E | F | G,
+    'U': B | C | D | E | F,
+}
+CHARACTERS['B'] = CHARACTERS['8']
+CHARACTERS['D'] = CHARACTERS['0']
+CHARACTERS['G'] = CHARACTERS['6']
+CHARACTERS['I'] = CHARACTERS['1']
+CHARACTERS['K'] = CHARACTERS['H']
+CHARACTERS['M'] = CHARACTERS['H']
+CHARACTERS['N'] = CHARACTERS['H']
+CHARACTERS['O'] = CHARACTERS['0']
+CHARACTERS['Q'] = CHARACTERS['0']
+CHARACTERS['S'] = CHARACTERS['5']
+CHARACTERS['T'] = CHARACTERS['7']
+CHARACTERS['V'] = CHARACTERS['U']
+CHARACTERS['W'] = CHARACTERS['U']
+CHARACTERS['X'] = CHARACTERS['H']
+CHARACTERS['Y'] = CHARACTERS['4']
+CHARACTERS['Z'] = CHARACTERS['2']
+
+# Segment masks indexed by character code. Lower case letters display as their upper case form.
+GLYPHS = bytearray(128)
+for _character, _mask in CHARACTERS.items():
+    if _character:
+        GLYPHS[ord(_character)] = _mask
+        GLYPHS[ord(_character.lower())] = _mask
+del _character, _mask
+
+
+def glyph(character):
+    """Returns the segment mask for `character`, or 0 (blank) if it can't be displayed.
+    """
+    character = str(character)
+
+    if len(character) != 1 or ord(character) >= len(GLYPHS):
+        return 0
+
+    return GLYPHS[ord(character)]
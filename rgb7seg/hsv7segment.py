@@ -1,14 +1,26 @@
 #!/usr/bin/env python3
 
-import math
-from colorsys import hsv_to_rgb
-
-from .is31fl3235a import IS31FL3235A
+from .color import ColorConverter
+from .is31fl3235a import IS31FL3235A, Frame
+
+# The (red, green, blue) LEDs for each segment, in segment mask bit order: A, B, C, D, E, F, G, DP
+SEGMENT_LEDS = (
+    (17, 16, 15),
+    (22, 21, 20),
+    (26, 27, 28),
+    (1, 2, 3),
+    (4, 5, 6),
+    (9, 7, 8),
+    (14, 13, 12),
+    (23, 24, 25),
+)
 
 
 class RGBSegment(object):
     """A single RGB LED segment on the numeral.
     """
+    __slots__ = ('leds', 'hsv')
+
     def __init__(self, led1, led2, led3):
         self.leds = (led1, led2, led3)
         self.hsv = [0, 0, 0]
@@ -17,7 +29,7 @@ class RGBSegment(object):
         return self.hsv
 
     def __set__(self, instance, value):
-        if not isinstance(value, list) or len(list) != 3:
+        if not isinstance(value, list) or len(value) != 3:
             raise ValueError('RGBSegment objects only accept 3 item lists.')
         self.hsv = value
 
@@ -53,27 +65,63 @@ class HSV7Segment(object):
             gamma_correction
                 A tuple describing gamma correction factors for each channel. Format: (R, G, B)
 
+            Gamma correction is done with lookup tables built from `gamma_correction`. Setting `gamma_correction` or one of `gamma_r`, `gamma_g`, `gamma_b` rebuilds the tables.
+
         For all other options refer to the IS31FL3235A class.
         """
         self.is31fl3235a = IS31FL3235A(buffered=buffered, **is31fl3235a_kwargs)
         self.buffered = buffered
+        self._frame_depth = 0
 
-        # Per channel gamma correction values
-        self.gamma_r = 2.5
-        self.gamma_g = 2.4
-        self.gamma_b = 2.4
+        # Per channel gamma correction lookup tables
+        self.converter = ColorConverter(gamma_correction)
 
         # Setup the segment state
-        self._a = RGBSegment(17, 16, 15)
-        self._b = RGBSegment(22, 21, 20)
-        self._c = RGBSegment(26, 27, 28)
-        self._d = RGBSegment(1, 2, 3)
-        self._e = RGBSegment(4, 5, 6)
-        self._f = RGBSegment(9, 7, 8)
-        self._g = RGBSegment(14, 13, 12)
-        self._dp = RGBSegment(23, 24, 25)
+        self._a = RGBSegment(*SEGMENT_LEDS[0])
+        self._b = RGBSegment(*SEGMENT_LEDS[1])
+        self._c = RGBSegment(*SEGMENT_LEDS[2])
+        self._d = RGBSegment(*SEGMENT_LEDS[3])
+        self._e = RGBSegment(*SEGMENT_LEDS[4])
+        self._f = RGBSegment(*SEGMENT_LEDS[5])
+        self._g = RGBSegment(*SEGMENT_LEDS[6])
+        self._dp = RGBSegment(*SEGMENT_LEDS[7])
         self.segments = {'a':self._a, 'b':self._b, 'c':self._c, 'd':self._d, 'e':self._e, 'f':self._f, 'g':self._g, 'dp':self._dp}
 
+        # The segments in segment mask bit order, see `rgb7seg.glyphs`
+        self.segment_list = (self._a, self._b, self._c, self._d, self._e, self._f, self._g, self._dp)
+
+    @property
+    def gamma_correction(self):
+        return self.converter.gamma_correction
+
+    @gamma_correction.setter
+    def gamma_correction(self, value):
+        self.converter.gamma_correction = value
+
+    @property
+    def gamma_r(self):
+        return self.converter.gamma_correction[0]
+
+    @gamma_r.setter
+    def gamma_r(self, value):
+        self.gamma_correction = (value, self.gamma_g, self.gamma_b)
+
+    @property
+    def gamma_g(self):
+        return self.converter.gamma_correction[1]
+
+    @gamma_g.setter
+    def gamma_g(self, value):
+        self.gamma_correction = (self.gamma_r, value, self.gamma_b)
+
+    @property
+    def gamma_b(self):
+        return self.converter.gamma_correction[2]
+
+    @gamma_b.setter
+    def gamma_b(self, value):
+        self.gamma_correction = (self.gamma_r, self.gamma_g, value)
+
     @property
     def a(self):
         return self._a
@@ -83,7 +131,7 @@ class HSV7Segment(object):
         if not isinstance(value, list) or len(value) != 3:
             raise ValueError('HSV7Segment segments only accept 3 item lists.')
         self._a.hsv = value
-        if not self.buffered:
+        if not (self.buffered or self._frame_depth):
             self.update()
 
     @property
@@ -95,7 +143,7 @@ class HSV7Segment(object):
         if not isinstance(value, list) or len(value) != 3:
             raise ValueError('HSV7Segment segments only accept 3 item lists.')
         self._b.hsv = value
-        if not self.buffered:
+        if not (self.buffered or self._frame_depth):
             self.update()
 
     @property
@@ -107,7 +155,7 @@ class HSV7Segment(object):
         if not isinstance(value, list) or len(value) != 3:
             raise ValueError('HSV7Segment segments only accept 3 item lists.')
         self._c.hsv = value
-        if not self.buffered:
+        if not (self.buffered or self._frame_depth):
             self.update()
 
     @property
@@ -119,7 +167,7 @@ class HSV7Segment(object):
         if not isinstance(value, list) or len(value) != 3:
             raise ValueError('HSV7Segment segments only accept 3 item lists.')
         self._d.hsv = value
-        if not self.buffered:
+        if not (self.buffered or self._frame_depth):
             self.update()
 
     @property
@@ -131,7 +179,7 @@ class HSV7Segment(object):
         if not isinstance(value, list) or len(value) != 3:
             raise ValueError('HSV7Segment segments only accept 3 item lists.')
         self._e.hsv = value
-        if not self.buffered:
+        if not (self.buffered or self._frame_depth):
             self.update()
 
     @property
@@ -143,7 +191,7 @@ class HSV7Segment(object):
         if not isinstance(value, list) or len(value) != 3:
             raise ValueError('HSV7Segment segments only accept 3 item lists.')
         self._f.hsv = value
-        if not self.buffered:
+        if not (self.buffered or self._frame_depth):
             self.update()
 
     @property
@@ -155,7 +203,7 @@ class HSV7Segment(object):
         if not isinstance(value, list) or len(value) != 3:
             raise ValueError('HSV7Segment segments only accept 3 item lists.')
         self._g.hsv = value
-        if not self.buffered:
+        if not (self.buffered or self._frame_depth):
             self.update()
 
     @property
@@ -167,14 +215,27 @@ class HSV7Segment(object):
         if not isinstance(value, list) or len(value) != 3:
             raise ValueError('HSV7Segment segments only accept 3 item lists.')
         self._dp.hsv = value
-        if not self.buffered:
+        if not (self.buffered or self._frame_depth):
+            self.update()
+
+    def set_segments(self, colors):
+        """Set the color of every segment at once, from a list of 8 HSV colors in segment mask bit order (A-G, DP). None turns a segment off.
+
+        Unless the numeral is buffered the change is written with a single update.
+        """
+        for segment, color in zip(self.segment_list, colors):
+            segment.hsv = (0, 0, 0) if color is None else color
+
+        if not (self.buffered or self._frame_depth):
             self.update()
 
     def gamma_correct(self, rgb):
+        """Apply gamma correction to an RGB value (0-1).
+        """
         return (
-            int(math.pow(float(rgb[0]), self.gamma_r)),
-            int(math.pow(float(rgb[1]), self.gamma_g)),
-            int(math.pow(float(rgb[2]), self.gamma_b)),
+            float(rgb[0]) ** self.gamma_r,
+            float(rgb[1]) ** self.gamma_g,
+            float(rgb[2]) ** self.gamma_b,
         )
 
     def rgb2pwm(self, rgb):
@@ -186,18 +247,51 @@ class HSV7Segment(object):
             int((rgb[2] * 255.0) + 0.5),
         )
 
+    def frame(self):
+        """Group changes into a single frame.
+
+        Segment and LED changes made inside the block are not written until it exits, then they are sent as one register burst and one flush. Frames can be nested, only the outermost frame writes to the IC. If the block raises an exception nothing is written.
+
+            with myNumeral.frame():
+                myNumeral.a = [0, 1, 1]
+                myNumeral.d = [0, 1, 1]
+        """
+        return Frame(self)
+
+    def _enter_frame(self):
+        self.is31fl3235a._enter_frame()
+        self._frame_depth += 1
+
+    def _exit_frame(self, completed):
+        self._frame_depth -= 1
+
+        try:
+            if not self._frame_depth and completed:
+                self.render()
+        except BaseException:
+            completed = False  # Don't write a half rendered frame
+            raise
+        finally:
+            self.is31fl3235a._exit_frame(completed)
+
+    def render(self):
+        """Convert the current state into PWM values for the ic without writing them.
+        """
+        hsv2pwm = self.converter.hsv2pwm
+        leds = self.is31fl3235a.leds
+
+        for segment in self.segment_list:
+            red, green, blue = hsv2pwm(segment.hsv)
+            led_r, led_g, led_b = segment.leds
+            leds[led_r] = red
+            leds[led_g] = green
+            leds[led_b] = blue
+
     def update(self):
         """Write the current state to the ic.
         """
-        for segment in self.segments.values():
-            rgb = hsv_to_rgb(*segment.hsv)
-            corrected_rgb = self.gamma_correct(rgb)
-            pwm = self.rgb2pwm(rgb)
-            for color, led in zip(pwm, segment.leds):
-                self.is31fl3235a[led] = color
-
-        if self.buffered:
-            self.is31fl3235a.update()
+        self.render()
+        self.is31fl3235a.update()
 
 
 if __name__ == '__main__':
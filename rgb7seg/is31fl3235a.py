@@ -1,18 +1,39 @@
 #!/usr/bin/env python3
 
-from smbus import SMBus
+from time import monotonic, perf_counter
+
+from .bus import open_bus
+
+FRAME_SIZE = 28  # One PWM register per LED, OUT1-OUT28
+
+
+class Frame(object):
+    """The context manager returned by `frame()` on IS31FL3235A and HSV7Segment.
+
+    It enters a frame on `owner` and leaves it when the block exits, telling it whether the block completed so nothing is written after an exception.
+    """
+    def __init__(self, owner):
+        self.owner = owner
+
+    def __enter__(self):
+        self.owner._enter_frame()
+        return self.owner
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.owner._exit_frame(exc_type is None)
+
 
 class IS31FL3235A(object):
     """A low-level class that represents a single is31fl3235a.
     """
-    def __init__(self, ic_address=None, i2c_bus=None, buffered=False, pmw_33kHz=True, skip_init=False):
+    def __init__(self, ic_address=None, i2c_bus=None, buffered=False, pmw_33kHz=True, skip_init=False, merge_gap=2, stats=None, retries=0, state_cache=None, combined=None):
         """Sets up the state for the is31fl3235a driver.
 
             ic_address
                 The i2c address for the IC. This is typically one of 4 values: 0x3C, 0x3D, 0x3E, 0x3F
 
             i2c_bus
-                The raspberry pi i2c bus to use. Defaults to 1. Use 0 on early model raspberry pi.
+                The raspberry pi i2c bus to use. Defaults to 1. Use 0 on early model raspberry pi. You can also pass a bus object, such as an `SMBusBackend` shared between several ICs or a `SimulatedBus`.
 
             pwm_33kHz
                 Whether or not to switch to 33kHz PWM frequency. True by default. If you set this to False you may get noise in the audible hearing range on VCC.
@@ -20,13 +41,37 @@ class IS31FL3235A(object):
             skip_init
                 When True `self.init_ic()` will not be called.
 
+            state_cache
+                A `StateCache`, or True to use one in /run/rgb7seg. The registers are recorded after every flush, and when the cache already has this IC's state it is attached to without a reset: the LEDs keep showing the current frame and the first update only writes what has changed. Only works with buses that have a `bus_id`, such as `SMBusBackend`.
+
             buffered
                 When True changes to the LED state will not be written immediately. You must call `self.update()` before changes will be reflected by the LEDs.
+
+            merge_gap
+                `self.update()` only writes the PWM registers that have changed. Runs of changed registers separated by `merge_gap` or fewer unchanged registers are sent as a single block write, since that is cheaper than starting a new transaction. Defaults to 2.
+
+            stats
+                A `BusStats` instance to record bus traffic and latency in. Several ICs can share one. When None (the default) nothing is recorded.
+
+            retries
+                How many times to retry a write that fails with an IOError before giving up. Defaults to 0.
+
+            combined
+                When True `self.update()` sends the changed PWM registers and the update register in one combined i2c transaction, using the bus's `write_messages()`. Defaults to True when the bus supports combined transactions.
         """
-        self.i2c_bus = SMBus(i2c_bus or 1)
+        self.i2c_bus = open_bus(i2c_bus)
         self.ic_address = ic_address or 0x3F
         self.buffered = buffered
         self.pwm_33kHz = True
+        self.merge_gap = merge_gap
+        self.stats = stats
+        self.retries = retries
+        if state_cache is True:
+            from .state import StateCache
+            state_cache = StateCache()
+        self.state_cache = state_cache
+        self.bus_id = getattr(self.i2c_bus, 'bus_id', None)
+        self.combined = getattr(self.i2c_bus, 'combined', False) if combined is None else combined
 
         # Registers
         self.led_register_start = 0x2A         # On/Off state for OUT1 (Values: 0/1)
@@ -45,8 +90,24 @@ class IS31FL3235A(object):
         self.leds = [0 for i in range(-2, self.pwm_register_end - self.pwm_register_start)]
         self.leds[0] = True
 
+        # The PWM values last written to the IC, or None when we don't know what the IC holds.
+        self.shadow = None
+        self._flush_pending = False
+        self._global_pending = False  # leds[0] has changed but not been written yet
+        self._frame_depth = 0
+        self._state_invalid = False  # The state cache has been invalidated since the last flush
+
+        # Startup timing, see `init_ics()`
+        self.created = monotonic()
+        self.init_time = None
+        self.time_to_first_frame = None
+
         # Prepare for operation
-        if not skip_init:
+        cached_state = self.load_state()
+        if cached_state:
+            self.leds[0], self.leds[1:] = cached_state
+            self.shadow = self.leds[1:]
+        elif not skip_init:
             self.init_ic()
 
     def __getitem__(self, index):
@@ -59,59 +120,176 @@ class IS31FL3235A(object):
             raise ValueError('(%s)%s is not a valid LED!' % (type(index), index))
 
         if index == 0:
-            if value:
-                self.leds[0] = True
-                self.write_register(self.global_control_register, 0)  # Normal operation
-            else:
-                self.leds[0] = False
-                self.write_register(self.global_control_register, 1)  # Shutdown all LEDs
+            self.leds[0] = bool(value)
 
-            if not self.buffered:
+            if self.buffered or self._frame_depth:
+                # Written by the next update, along with the PWM registers
+                self._global_pending = True
+                self._flush_pending = True
+            else:
+                self.write_register(self.global_control_register, self.global_control_value())
+                self._global_pending = False
                 self.flush()
         else:
             if 0 > value or value > 255:
                 raise ValueError('LED brightness must be between 0 and 255! (%s)' % (value,))
 
             self.leds[index] = int(value + .5)
-            if not self.buffered:
+            if not (self.buffered or self._frame_depth):
                 self.update()
 
 
-    def update(self):
+    def global_control_value(self):
+        """The global control register value for `self.leds[0]`: 0 for normal operation, 1 to shut down all LEDs.
+        """
+        return 0 if self.leds[0] else 1
+
+    def frame(self):
+        """Defer LED writes until the block exits, then write them with a single `self.update()`.
+
+            with is31fl3235a.frame():
+                is31fl3235a[1] = 255
+                is31fl3235a[2] = 255
+
+        Frames can be nested, only the outermost frame writes to the IC. If the block raises an exception nothing is written.
+        """
+        return Frame(self)
+
+    def _enter_frame(self):
+        self._frame_depth += 1
+
+    def _exit_frame(self, completed):
+        self._frame_depth -= 1
+
+        if not self._frame_depth and completed:
+            self.update()
+
+    def dirty_runs(self, values):
+        """Return a list of `(start, end)` slices of `values` that differ from what the IC holds.
+
+        Runs that are `self.merge_gap` or fewer registers apart are merged into a single run.
+        """
+        shadow = self.shadow
+
+        if shadow is None:
+            return [(0, len(values))]
+
+        if values == shadow:
+            return []
+
+        runs = []
+        start = end = None
+        for i, (new, old) in enumerate(zip(values, shadow)):
+            if new != old:
+                if start is None:
+                    start = i
+                elif i - end > self.merge_gap:
+                    runs.append((start, end))
+                    start = i
+                end = i + 1
+
+        if start is not None:
+            runs.append((start, end))
+
+        return runs
+
+    def update(self, flush=True):
         """Write the current LED status to the IC.
+
+        Only the PWM registers that have changed since the last update are written. If nothing has changed the flush is skipped as well.
+
+        When `flush` is False the PWM registers are written but not made live. Returns True when a flush is needed, so the caller can `self.flush()` several ICs back to back.
+        """
+        return self.write_frame(self.leds[1:], flush)
+
+    def write_frame(self, values, flush=True):
+        """Write a list of 28 PWM values to the IC, like `self.update()` but without reading `self.leds`.
+
+        `values` becomes the new shadow copy of the IC, so it must not be changed afterwards.
         """
-        self.write_register(self.pwm_register_start, self.leds[1:])
-        self.flush()
+        if flush and self.combined:
+            return bool(write_frames([self], [values]))
+
+        runs = self.dirty_runs(values)
+
+        try:
+            if self._global_pending:
+                self.write_register(self.global_control_register, self.global_control_value())
+                self._global_pending = False
+
+            for start, end in runs:
+                self.write_register(self.pwm_register_start + start, values[start:end])
+        except Exception:
+            # Some of the registers may have been written, so we no longer know what the IC holds
+            self.shadow = None
+            raise
+
+        self.shadow = values
+
+        if runs:
+            # The registers hold values that aren't live yet, so the next update must flush even if nothing else changes
+            self._flush_pending = True
+        elif not self._flush_pending:
+            return False
+
+        if flush:
+            self.flush()
+
+        return True
 
     def flush(self):
         """Make the pending LED changes live.
         """
         self.write_register(self.pwm_update_register, 0)
+        self._flushed()
 
-    def init_ic(self):
-        """Setup the led controller.
+    def _flushed(self):
+        self._flush_pending = False
+
+        if self.time_to_first_frame is None:
+            self.time_to_first_frame = monotonic() - self.created
+
+        if self.state_cache is not None:
+            self.save_state()
+
+    def load_state(self):
+        """Returns `(global_on, pwm_values)` from `self.state_cache`, or None when there is no cached state.
         """
-        # Reset the IC to its default state
-        self.write_register(self.reset_register, 0)
+        if self.state_cache is None or self.bus_id is None:
+            return None
 
-        # Set all PWM values to 0 (off)
-        for i in range(self.pwm_register_start, self.pwm_register_end):
-            self.write_register(i, 0x00)
+        return self.state_cache.load(self.bus_id, self.ic_address)
 
-        # Turn on all LEDs
-        for i in range(self.led_register_start, self.led_register_end + 1):
-            self.write_register(i, 0xFF)
+    def save_state(self):
+        """Record the committed registers in `self.state_cache`.
+        """
+        if self.state_cache is None or self.bus_id is None or self.shadow is None:
+            return
+
+        self.state_cache.save(self.bus_id, self.ic_address, self.leds[0], self.shadow)
+        self._state_invalid = False
+
+    def invalidate_state(self):
+        """Invalidate `self.state_cache` before the registers are changed, so nobody attaches to the IC until they are committed again.
+        """
+        if self.state_cache is None or self.bus_id is None or self._state_invalid:
+            return
 
-        # Housekeeping
-        self.update()
-        if self.pwm_33kHz:
-            self.write_register(0x4B, 0x01)  # Set frequency to 33kHz
-        self.write_register(0x00, 0x01)  # Start normal operation
+        self.state_cache.invalidate(self.bus_id, self.ic_address)
+        self._state_invalid = True
+
+    def init_ic(self):
+        """Setup the led controller.
+
+        Returns the number of seconds it took.
+        """
+        return init_ics([self])
 
     def reset(self):
         """Reset the IC to its startup state.
         """
         self.write_register(self.reset_register, 0)
+        self.shadow = [0] * (len(self.leds) - 1)
 
     def write_register(self, register, value):
         """Write one or more bytes to the i2c bus.
@@ -123,10 +301,213 @@ class IS31FL3235A(object):
         if not isinstance(value, (int, list, tuple)):
             raise ValueError('value must be an integer, or list/tuple of integers!')
 
+        if self.state_cache is not None and not self._state_invalid:
+            self.invalidate_state()
+
+        if self.stats is None and not self.retries:
+            if isinstance(value, int):
+                self.i2c_bus.write_byte_data(self.ic_address, register, value)
+            else:
+                self.i2c_bus.write_i2c_block_data(self.ic_address, register, value)
+            return
+
+        self._write_register_monitored(register, value)
+
+    def write_messages(self, messages):
+        """Write a list of `(address, register, values)` messages with the bus's `write_messages()`, as one combined transaction when the bus supports it.
+        """
+        if self.stats is None and not self.retries:
+            self.i2c_bus.write_messages(messages)
+            return
+
+        nbytes = sum(len(values) + 2 for address, register, values in messages)
+        self._write_monitored('commit', nbytes, self.i2c_bus.write_messages, messages)
+
+    def _write_register_monitored(self, register, value):
         if isinstance(value, int):
-            self.i2c_bus.write_byte_data(self.ic_address, register, value)
+            write = self.i2c_bus.write_byte_data
+            operation = 'flush' if register == self.pwm_update_register else 'write_byte'
+            nbytes = 3
         else:
-            self.i2c_bus.write_i2c_block_data(self.ic_address, register, value)
+            write = self.i2c_bus.write_i2c_block_data
+            operation = 'write_block'
+            nbytes = len(value) + 2
+
+        self._write_monitored(operation, nbytes, write, self.ic_address, register, value)
+
+    def _write_monitored(self, operation, nbytes, write, *args):
+        """Call `write(*args)`, retrying if it fails and recording it in `self.stats`.
+        """
+        stats = self.stats
+        attempt = 0
+
+        while True:
+            start = perf_counter()
+            try:
+                write(*args)
+            except IOError as e:
+                if stats is not None:
+                    stats.record(operation, nbytes, perf_counter() - start, e)
+
+                if attempt >= self.retries:
+                    raise
+
+                attempt += 1
+                if stats is not None:
+                    stats.retries += 1
+            else:
+                if stats is not None:
+                    stats.record(operation, nbytes, perf_counter() - start)
+                return
+
+
+def init_ics(is31fl3235as):
+    """Setup several led controllers in one pass.
+
+    Each step is done for every IC before moving on to the next step, and the PWM and LED control registers are set with one auto-increment block write each, so an IC takes 6 transactions to set up. The current `leds` values become the first PWM values.
+
+    Each IC's `init_time` is set to the time it took, and `time_to_first_frame` is measured from the IC's creation until its first `flush()` after setup. Returns the number of seconds it took.
+    """
+    start = monotonic()
+
+    # Reset the ICs to their default state
+    for ic in is31fl3235as:
+        ic.reset()
+
+    # Load the initial PWM values
+    for ic in is31fl3235as:
+        values = ic.leds[1:]
+        ic.write_register(ic.pwm_register_start, values)
+        ic.shadow = values
+
+    # Turn on all LEDs
+    for ic in is31fl3235as:
+        ic.write_register(ic.led_register_start, [0xFF] * (ic.led_register_end - ic.led_register_start + 1))
+
+    # Make the PWM and LED control registers live
+    for ic in is31fl3235as:
+        ic.write_register(ic.pwm_update_register, 0)
+        ic._flush_pending = False
+
+    # Housekeeping
+    for ic in is31fl3235as:
+        if ic.pwm_33kHz:
+            ic.write_register(ic.output_frequency_register, 0x01)  # Set frequency to 33kHz
+
+    for ic in is31fl3235as:
+        ic.write_register(ic.shutdown_register, 0x01)  # Start normal operation
+
+    elapsed = monotonic() - start
+    for ic in is31fl3235as:
+        ic.init_time = elapsed
+        ic.time_to_first_frame = None
+        ic.save_state()
+
+    return elapsed
+
+
+def init_new_ics(is31fl3235as):
+    """Setup the ICs that weren't attached to from a state cache, in one pass. See `init_ics()`.
+    """
+    return init_ics([ic for ic in is31fl3235as if ic.shadow is None])
+
+
+def flush_all(is31fl3235as):
+    """Flush each IC in turn. If a flush fails the rest are still flushed, then the first error is raised.
+
+    An IC whose flush failed keeps its flush pending, so its next `update()` tries again.
+    """
+    error = None
+
+    for ic in is31fl3235as:
+        try:
+            ic.flush()
+        except Exception as e:
+            if error is None:
+                error = e
+
+    if error is not None:
+        raise error
+
+
+def write_frames(is31fl3235as, frames):
+    """Write a list of 28 PWM values to each IC and make them live, all in one combined i2c transaction.
+
+    The ICs must share a bus that supports `write_messages()`. Only the changed registers are written, and the update register writes come after every PWM write so all the ICs change together. Returns the ICs that were flushed.
+    """
+    writes = []
+    latches = []
+    flushed = []
+
+    for ic, values in zip(is31fl3235as, frames):
+        runs = ic.dirty_runs(values)
+        if ic._global_pending:
+            writes.append((ic.ic_address, ic.global_control_register, [ic.global_control_value()]))
+        for start, end in runs:
+            writes.append((ic.ic_address, ic.pwm_register_start + start, values[start:end]))
+
+        if runs or ic._flush_pending:
+            latches.append((ic.ic_address, ic.pwm_update_register, [0]))
+            flushed.append(ic)
+
+    if not flushed:
+        return flushed
+
+    for ic in flushed:
+        if ic.state_cache is not None:
+            ic.invalidate_state()
+
+    try:
+        is31fl3235as[0].write_messages(writes + latches)
+    except Exception:
+        # Some of the messages may have been written, so we no longer know what the ICs hold
+        for ic in is31fl3235as:
+            ic.shadow = None
+        raise
+
+    for ic, values in zip(is31fl3235as, frames):
+        ic.shadow = values
+        ic._global_pending = False
+
+    stats = is31fl3235as[0].stats
+    if stats is not None:
+        stats.flushes += len(flushed)
+
+    for ic in flushed:
+        ic._flushed()
+
+    return flushed
+
+
+def commit_frames(is31fl3235as, frames, barrier=None):
+    """Write a list of 28 PWM values to each IC, then make them all live together.
+
+    When every IC uses combined transactions the frames go out with `write_frames()`. Otherwise each IC's changed registers are written in turn and the flushes are sent back to back afterwards. If a write fails the ICs that were written are still flushed before the error is raised. Returns the ICs that were flushed.
+
+    `barrier` is a barrier shared with commits running on other buses, waited on just before this bus starts latching, so every bus changes at the same time. It is aborted if a write fails. Its `wait()` must return even when the barrier is broken, since the registers this bus has written still need to be made live, see `rgb7seg.multibus`.
+    """
+    if all(ic.combined for ic in is31fl3235as):
+        # The whole frame goes out in one transaction, so start it together with the other buses
+        if barrier is not None:
+            barrier.wait()
+        return write_frames(is31fl3235as, frames)
+
+    pending = []
+    try:
+        for ic, values in zip(is31fl3235as, frames):
+            if ic.write_frame(values, flush=False):
+                pending.append(ic)
+    except Exception:
+        if barrier is not None:
+            barrier.abort()
+        flush_all(pending)
+        raise
+
+    if barrier is not None:
+        barrier.wait()
+    flush_all(pending)
+
+    return pending
 
 
 if __name__ == '__main__':
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .display_array import DisplayArray
+from .is31fl3235a import commit_frames
+
+
+class _CommitBarrier(threading.Barrier):
+    """A barrier whose `wait()` returns when it is broken, so a bus still latches what it has written when another bus fails.
+    """
+    def wait(self, timeout=None):
+        try:
+            return threading.Barrier.wait(self, timeout)
+        except threading.BrokenBarrierError:
+            return None
+
+
+class MultiBusController(DisplayArray):
+    """Drives numerals spread over several i2c buses as a single display.
+
+    The numerals are grouped by bus and each bus gets its own worker thread. When a frame is committed every bus writes its PWM registers at the same time, the workers wait for each other, and then every bus sends its flushes. Buses that support combined transactions send their whole frame in one transaction, started together. A frame takes as long as the slowest bus rather than the sum of all of them.
+
+    All the DisplayArray methods work, treating the numerals as one row in the order they were given.
+    """
+    def __init__(self, displays):
+        """Setup the controller.
+
+        Options:
+
+            displays
+                A list of NumberDisplay and/or DisplayArray objects, from left to right. They can be on any mix of buses.
+        """
+        self.numerals = []
+        for display in displays:
+            self.numerals.extend(getattr(display, 'numerals', [display]))
+
+        self.colors = self.numerals[0].colors if self.numerals else {}
+
+        # Group the ICs by physical bus, keeping them in order. Numerals opened with the same bus number get separate bus objects, so use the bus_id when there is one.
+        groups = {}
+        for numeral in self.numerals:
+            is31fl3235a = numeral.hsv7seg.is31fl3235a
+            bus_id = getattr(is31fl3235a.i2c_bus, 'bus_id', None)
+            groups.setdefault(id(is31fl3235a.i2c_bus) if bus_id is None else ('bus', bus_id), []).append(is31fl3235a)
+
+        self.groups = list(groups.values())
+        self.executors = [ThreadPoolExecutor(max_workers=1, thread_name_prefix='rgb7seg-bus') for group in self.groups]
+
+    def commit(self):
+        """Write the prepared PWM values on every bus in parallel, then make them live together.
+        """
+        barrier = _CommitBarrier(len(self.groups))
+        futures = [executor.submit(commit_frames, group, [ic.leds[1:] for ic in group], barrier) for executor, group in zip(self.executors, self.groups)]
+        errors = []
+
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                errors.append(e)
+
+        if errors:
+            raise errors[0]
+
+    def close(self):
+        """Stop the worker threads.
+        """
+        for executor in self.executors:
+            executor.shutdown()
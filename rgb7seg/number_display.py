@@ -1,14 +1,8 @@
 #!/usr/bin/env python3
 
-import random
-from time import sleep, time
-
-import smbus
-
+from .glyphs import CHARACTERS, DP, glyph
 from .hsv7segment import HSV7Segment
 
-start_time = time()
-
 HTML_COLORS = {
     # name      hue         sat  val
     'white':   (0,          0,   0.25),
@@ -28,113 +22,211 @@ HTML_COLORS = {
 }
 
 
+def check_color(color):
+    """Raise ValueError if `color` is not a valid (hue, saturation, value) color.
+    """
+    if len(color) != 3:
+        raise ValueError('set_color(color) must be passed a tuple consisting of (hue, saturation, value)')
+    if not (0 <= color[0] <= 1):
+        raise ValueError('set_color(color): hue must be between 0 and 1.')
+    if not (0 <= color[1] <= 1):
+        raise ValueError('set_color(color): saturation must be between 0 and 1.')
+    if not (0 <= color[2] <= 1):
+        raise ValueError('set_color(color): value must be between 0 and 1.')
+
+
+class _NoLock(object):
+    """Stands in for a lock when a NumberDisplay writes from the calling thread.
+    """
+    def __enter__(self):
+        pass
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
 class NumberDisplay(object):
-    def __init__(self, i2c_bus=None, ic_address=None, colors=HTML_COLORS):
-        self.hsv7seg = HSV7Segment(i2c_bus=i2c_bus, ic_address=ic_address, buffered=True)
-        self.segments_enabled = {'a':False, 'b':False, 'c':False, 'd':False, 'e':False, 'f':False, 'g':False, 'dp':False}
+    characters = CHARACTERS
+
+    def __init__(self, i2c_bus=None, ic_address=None, colors=HTML_COLORS, nonblocking=False, frame_cache_size=64, **hsv7segment_kwargs):
+        """Setup the numeral.
+
+        When `nonblocking` is True display calls render the frame and hand it to a `FrameWriter`, which writes it to the IC from a background thread. Calls never wait for the bus, and if frames arrive faster than the bus can take them only the newest is written. The display can then be shared between threads.
+
+        Rendered frames are kept in a least recently used cache of `frame_cache_size` entries, keyed by character and color, so showing a combination again skips the color conversion. Hits and misses are counted in `self.frame_cache_hits` and `self.frame_cache_misses`. Set `frame_cache_size` to 0 to turn the cache off.
+
+        For all other options refer to the HSV7Segment class.
+        """
+        self.hsv7seg = HSV7Segment(i2c_bus=i2c_bus, ic_address=ic_address, buffered=True, **hsv7segment_kwargs)
+        self.writer = None
+        self._lock = _NoLock()
+
+        if nonblocking:
+            import threading
+            from .writer import FrameWriter
+
+            self.writer = FrameWriter(self.hsv7seg.is31fl3235a)
+            self._lock = threading.RLock()
+
+        # Rendered frames, see `self.render()`
+        self.frame_cache = {}  # Kept in least to most recently used order
+        self.frame_cache_size = frame_cache_size
+        self.frame_cache_hits = 0
+        self.frame_cache_misses = 0
+        self._frame_cache_tables = self.hsv7seg.converter.tables
+
+        self.segments_enabled = 0  # Segment mask, see `rgb7seg.glyphs`
         self.color = colors['white']
-        self.color_off = colors['black']
-        self.colors = colors
-        self.characters = {
-            '': {'a':False, 'b':False, 'c':False, 'd':False, 'e':False, 'f':False, 'g':False},
-            '0': {'a':True, 'b':True, 'c':True, 'd':True, 'e':True, 'f':True, 'g':False},
-            '1': {'a':False, 'b':True, 'c':True, 'd':False, 'e':False, 'f':False, 'g':False},
-            '2': {'a':True, 'b':True, 'c':False, 'd':True, 'e':True, 'f':False, 'g':True},
-            '3': {'a':True, 'b':True, 'c':True, 'd':True, 'e':False, 'f':False, 'g':True},
-            '4': {'a':False, 'b':True, 'c':True, 'd':False, 'e':False, 'f':True, 'g':True},
-            '5': {'a':True, 'b':False, 'c':True, 'd':True, 'e':False, 'f':True, 'g':True},
-            '6': {'a':True, 'b':False, 'c':True, 'd':True, 'e':True, 'f':True, 'g':True},
-            '7': {'a':True, 'b':True, 'c':True, 'd':False, 'e':False, 'f':False, 'g':False},
-            '8': {'a':True, 'b':True, 'c':True, 'd':True, 'e':True, 'f':True, 'g':True},
-            '9': {'a':True, 'b':True, 'c':True, 'd':True, 'e':False, 'f':True, 'g':True},
-            'A': {'a':True, 'b':True, 'c':True, 'd':False, 'e':True, 'f':True, 'g':True},
-            'C': {'a':True, 'b':False, 'c':False, 'd':True, 'e':True, 'f':True, 'g':False},
-            'E': {'a':True, 'b':False, 'c':False, 'd':True, 'e':True, 'f':True, 'g':True},
-            'F': {'a':True, 'b':False, 'c':False, 'd':False, 'e':True, 'f':True, 'g':True},
-            'H': {'a':False, 'b':True, 'c':True, 'd':False, 'e':True, 'f':True, 'g':True},
-            'J': {'a':False, 'b':True, 'c':True, 'd':True, 'e':True, 'f':False, 'g':False},
-            'L': {'a':False, 'b':False, 'c':False, 'd':True, 'e':True, 'f':True, 'g':False},
-            'P': {'a':True, 'b':True, 'c':False, 'd':False, 'e':True, 'f':True, 'g':True},
-            'R': {'a':True, 'b':True, 'c':True, 'd':False, 'e':True, 'f':True, 'g':True},
-            'U': {'a':False, 'b':True, 'c':True, 'd':True, 'e':True, 'f':True, 'g':False},
-        }
-        self.characters['B'] = self.characters['8']
-        self.characters['D'] = self.characters['0']
-        self.characters['G'] = self.characters['6']
-        self.characters['I'] = self.characters['1']
-        self.characters['K'] = self.characters['H']
-        self.characters['M'] = self.characters['H']
-        self.characters['N'] = self.characters['H']
-        self.characters['O'] = self.characters['0']
-        self.characters['Q'] = self.characters['0']
-        self.characters['S'] = self.characters['5']
-        self.characters['T'] = self.characters['7']
-        self.characters['V'] = self.characters['U']
-        self.characters['W'] = self.characters['U']
-        self.characters['X'] = self.characters['H']
-        self.characters['Y'] = self.characters['4']
-        self.characters['Z'] = self.characters['2']
+        self._color_off = colors['black']
+        self._colors = colors
+
+    @property
+    def color_off(self):
+        return self._color_off
+
+    @color_off.setter
+    def color_off(self, value):
+        self._color_off = value
+        self.frame_cache.clear()
+
+    @property
+    def colors(self):
+        return self._colors
+
+    @colors.setter
+    def colors(self, value):
+        self._colors = value
+        self.frame_cache.clear()
+
+    def render(self):
+        """Prepare the PWM values for the current character and color without writing them to the IC.
+        """
+        mask = self.segments_enabled
+        color, color_off = self.color, self.color_off
+
+        for segment in self.hsv7seg.segment_list:
+            segment.hsv = color if mask & 1 else color_off
+            mask >>= 1
+
+        if not self.frame_cache_size:
+            self.hsv7seg.render()
+            return
+
+        cache = self.frame_cache
+        if self._frame_cache_tables is not self.hsv7seg.converter.tables:
+            # The gamma correction has changed
+            cache.clear()
+            self._frame_cache_tables = self.hsv7seg.converter.tables
+
+        key = (self.segments_enabled, tuple(color))
+        frame = cache.pop(key, None)
+
+        if frame is not None:
+            cache[key] = frame  # Move it to the most recently used end
+            self.hsv7seg.is31fl3235a.leds[1:] = frame
+            self.frame_cache_hits += 1
+            return
+
+        self.hsv7seg.render()
+        cache[key] = self.hsv7seg.is31fl3235a.leds[1:]
+        self.frame_cache_misses += 1
+
+        if len(cache) > self.frame_cache_size:
+            del cache[next(iter(cache))]
+
+    def commit(self):
+        """Write the prepared PWM values to the IC, or hand them to the writer thread.
+        """
+        if self.writer is not None:
+            self.writer.post(self.hsv7seg.is31fl3235a.leds[1:])
+        else:
+            self.hsv7seg.is31fl3235a.update()
+
+    def flush(self, timeout=None):
+        """Wait until the writer thread has written the latest frame. Returns False if `timeout` seconds passed first.
+
+        Raises the error if the latest frame couldn't be written. The frame is then tried again, so calling `flush()` until it returns True makes sure it reaches the numeral.
+
+        Blocking displays write as they go, so this returns True straight away.
+        """
+        if self.writer is None:
+            return True
+
+        return self.writer.flush(timeout)
+
+    def close(self):
+        """Write the pending frame and stop the writer thread. The bus is left open, since other numerals may share it.
+
+        Raises the error if the last frame couldn't be written.
+        """
+        if self.writer is not None:
+            self.writer.close()
 
     def update(self):
-        for segment in self.hsv7seg.segments:
-            if not self.segments_enabled[segment]:
-                self.hsv7seg.segments[segment].hsv = self.color_off
-            else:
-                self.hsv7seg.segments[segment].hsv = self.color
-        self.hsv7seg.update()
+        with self._lock:
+            self.render()
+            self.commit()
 
     def set_color(self, color):
-        if not isinstance(color, tuple) and len(color) != 3:
-            raise ValueError('set_color(color) must be passed a tuple consisting of (hue, saturation, value)')
-        if not (0 <= color[0] <= 1):
-            raise ValueError('set_color(color): hue must be between 0 and 1.')
-        if not (0 <= color[1] <= 1):
-            raise ValueError('set_color(color): saturation must be between 0 and 1.')
-        if not (0 <= color[2] <= 1):
-            raise ValueError('set_color(color): value must be between 0 and 1.')
-
-        self.color = color
-        self.update()
-        
-    def display(self, character='', color=None):
-        character = str(character).upper()
-        if character not in self.characters:
-            #print('Warning: Character not found!')
-            character = ''
+        check_color(color)
+
+        with self._lock:
+            self.color = color
+            self.update()
+
+    def set_segments(self, colors):
+        """Show a list of 8 HSV colors, one per segment in segment mask bit order (A-G, DP). None turns a segment off.
+
+        This is how per-segment effects from `rgb7seg.effects` are shown. Afterwards `self.segments_enabled` has the segments that were given a color.
+        """
+        with self._lock:
+            mask = 0
+            for i, color in enumerate(colors):
+                if color is not None:
+                    mask |= 1 << i
+
+            self.segments_enabled = mask
+            self.hsv7seg.set_segments(colors)
+            self.hsv7seg.render()
+            self.commit()
+
+    def set_character(self, character='', dp=False):
+        """Select the character to display without writing it to the IC.
+        """
+        mask = glyph(character)
+        self.segments_enabled = mask | DP if dp else mask
 
+    def display(self, character='', color=None):
         if color:
-            self.set_color(color)
+            check_color(color)
 
-        self.segments_enabled.update(self.characters[character])
-        self.update()
+        with self._lock:
+            if color:
+                self.color = color
 
-    def breathing(self):
+            self.set_character(character)
+            self.update()
+
+    def breathing(self, fps=30, block=True):
         """Implementation of an LED breathing effect.
 
-        This function blocks and should be called in a thread or something.
+        The effect runs on a background thread at `fps` frames per second. When `block` is True this function waits forever, otherwise it returns the `Animator` running the effect so you can `stop()` it.
         """
-        color = list(self.color)
-        top_pause_time = .2
-        bottom_pause_time = .4
-
-        while True:
-            print('Color:', color)
-            x = 0
-            while x < 1:
-                color[2] = x
-                self.set_color(color)
-                x += 0.00390625
-            sleep(top_pause_time)
-            while x >= 0:
-                color[2] = x
-                self.set_color(color)
-                x -= 0.00390625
-            sleep(bottom_pause_time)
-            color = [random.random(), random.random(), 0]
+        from . import animation
+
+        animator = animation.Animator(self, fps)
+        animator.start(animation.breathing(self.color, fps))
+
+        if block:
+            animator.wait()
+
+        return animator
 
 
 if __name__ == '__main__':
     import random
+    from time import sleep
+
     display = NumberDisplay()
 
     # Display the alphabet in random colors
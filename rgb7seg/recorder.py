@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""Record the writes sent to an i2c bus, and replay them later.
+
+A recording is a header followed by one record per write:
+
+    header
+        5 bytes: magic (b'R7RC'), version
+
+    record
+        12 bytes: monotonic timestamp (double), kind, address, register, payload length, followed by the payload
+
+    kind
+        0 = byte write, 1 = block write, 2 = a message of a combined transaction that continues with the next record
+
+All numbers are little endian. Records are only ever appended, so a recording that was cut short is still readable up to the last complete record.
+
+Replay a recording to the real bus, or print it, with:
+
+    python3 -m rgb7seg.recorder --speed 2 writes.r7rc
+    python3 -m rgb7seg.recorder --dump writes.r7rc
+"""
+import mmap
+import struct
+import threading
+from time import monotonic
+
+from .bus import I2CBus, open_bus
+
+MAGIC = b'R7RC'
+VERSION = 1
+HEADER = struct.Struct('<4sB')     # magic, version
+RECORD = struct.Struct('<dBBBB')  # timestamp, kind, address, register, payload length
+
+WRITE_BYTE = 0
+WRITE_BLOCK = 1
+WRITE_CONTINUED = 2
+
+
+class RecordingBus(I2CBus):
+    """Passes writes through to another bus, appending each one that succeeds to a recording.
+
+    Records go through a buffered file, so recording costs a `struct.pack()` and a memory copy per write. Call `flush()` to push the buffer to disk, or `close()` when you are done.
+    """
+    def __init__(self, bus, path, buffer_size=65536):
+        """Setup the recorder.
+
+        Options:
+
+            bus
+                The bus to write to. A bus number opens an `SMBusBackend`, and a raw `smbus.SMBus` works too.
+
+            path
+                The file to record to. New records are appended to an existing recording.
+
+            buffer_size
+                How many bytes of records to hold in memory before writing them to the file.
+        """
+        self.bus = open_bus(bus)
+        self.bus_id = getattr(self.bus, 'bus_id', None)
+        self.combined = getattr(self.bus, 'combined', False)
+        self.records = 0
+        self.file = open(path, 'ab', buffering=buffer_size)
+
+        if not self.file.tell():
+            self.file.write(HEADER.pack(MAGIC, VERSION))
+
+    def write_byte_data(self, address, register, value):
+        timestamp = monotonic()
+        self.bus.write_byte_data(address, register, value)
+        self.file.write(RECORD.pack(timestamp, WRITE_BYTE, address, register, 1) + bytes((value,)))
+        self.records += 1
+
+    def write_i2c_block_data(self, address, register, values):
+        timestamp = monotonic()
+        self.bus.write_i2c_block_data(address, register, values)
+        self.file.write(RECORD.pack(timestamp, WRITE_BLOCK, address, register, len(values)) + bytes(values))
+        self.records += 1
+
+    def write_messages(self, messages):
+        if not self.combined:
+            return I2CBus.write_messages(self, messages)
+
+        timestamp = monotonic()
+        self.bus.write_messages(messages)
+
+        last = len(messages) - 1
+        for i, (address, register, values) in enumerate(messages):
+            self.file.write(RECORD.pack(timestamp, WRITE_CONTINUED if i < last else WRITE_BLOCK, address, register, len(values)) + bytes(values))
+        self.records += len(messages)
+
+    def flush(self):
+        """Write the buffered records to the file.
+        """
+        self.file.flush()
+
+    def close(self):
+        """Finish the recording and close the bus.
+        """
+        self.file.close()
+        self.bus.close()
+
+
+class Recording(object):
+    """A recording made by `RecordingBus`, read through mmap so it is never loaded into memory as a whole.
+    """
+    def __init__(self, path):
+        self.path = path
+
+        with open(path, 'rb') as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.mmap) < HEADER.size:
+            raise ValueError('%s is not an rgb7seg recording!' % path)
+
+        magic, version = HEADER.unpack_from(self.mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('%s is not an rgb7seg recording!' % path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __iter__(self):
+        """Yields `(timestamp, kind, address, register, payload)` for each write, oldest first.
+        """
+        data = self.mmap
+        size = len(data)
+        offset = HEADER.size
+
+        while offset + RECORD.size <= size:
+            timestamp, kind, address, register, length = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            if offset + length > size:
+                break  # Cut short while recording
+
+            yield timestamp, kind, address, register, data[offset:offset + length]
+            offset += length
+
+    def replay(self, bus, speed=1.0, stop=None):
+        """Re-issue the recorded writes to `bus`, which can be a bus number or a bus object such as `SimulatedBus`.
+
+        The writes keep their original spacing divided by `speed`, so 2 replays twice as fast. When `speed` is None they are written as fast as the bus will take them. Pass a `threading.Event` as `stop` to end the replay from another thread.
+
+        Returns the number of writes that were replayed.
+        """
+        bus = open_bus(bus)
+        stop = stop or threading.Event()
+        start = first = None
+        combined = []
+        count = 0
+
+        for timestamp, kind, address, register, payload in self:
+            if stop.is_set():
+                break
+
+            if speed:
+                if first is None:
+                    start, first = monotonic(), timestamp
+
+                delay = start + (timestamp - first) / speed - monotonic()
+                if delay > 0 and stop.wait(delay):
+                    break
+
+            if kind == WRITE_CONTINUED:
+                combined.append((address, register, list(payload)))
+                continue
+
+            if combined:
+                combined.append((address, register, list(payload)))
+                bus.write_messages(combined)
+                count += len(combined)
+                combined = []
+                continue
+
+            if kind == WRITE_BYTE:
+                bus.write_byte_data(address, register, payload[0])
+            else:
+                bus.write_i2c_block_data(address, register, list(payload))
+
+            count += 1
+
+        return count
+
+    def close(self):
+        self.mmap.close()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python3 -m rgb7seg.recorder', description='Replay or print an rgb7seg recording.')
+    parser.add_argument('path', help='The recording to read')
+    parser.add_argument('-b', '--bus', type=int, default=1, help='i2c bus number to replay to (default: %(default)s)')
+    parser.add_argument('-s', '--speed', type=float, default=1.0, help='Replay speed, 0 for as fast as possible (default: %(default)s)')
+    parser.add_argument('-d', '--dump', action='store_true', help='Print the writes instead of replaying them')
+    args = parser.parse_args(argv)
+
+    with Recording(args.path) as recording:
+        if args.dump:
+            first = None
+            for timestamp, kind, address, register, payload in recording:
+                if first is None:
+                    first = timestamp
+                print('%10.6f 0x%02X 0x%02X %s' % (timestamp - first, address, register, ' '.join('%02X' % value for value in payload)))
+        else:
+            recording.replay(args.bus, args.speed)
+
+
+if __name__ == '__main__':
+    main()
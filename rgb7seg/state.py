@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+import os
+import struct
+
+DEFAULT_DIRECTORY = '/run/rgb7seg'
+
+# File format: magic, global LED state (0/1), PWM values for OUT1-OUT28
+MAGIC = b'R7ST'
+STATE = struct.Struct('<4sB28s')
+INVALID = bytes(len(MAGIC))  # Written over the magic while registers are being changed
+
+
+class StateCache(object):
+    """Remembers the registers last committed to each IC, so a new process can attach to an IC without resetting it.
+
+    State is kept in one small file per IC, named after the bus and address. The file is invalidated before the IC's registers are changed and saved again once they have been made live, so a process that dies or fails partway through a frame leaves nothing to attach to. The default directory is on tmpfs, so the cache is cleared at boot along with the ICs themselves. If an IC loses power without a reboot its cached state will be wrong, delete the file (or call `forget()`) to force a reset.
+    """
+    def __init__(self, directory=DEFAULT_DIRECTORY):
+        """Setup the cache, creating `directory` if needed.
+        """
+        self.directory = directory
+        self._files = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, bus_id, address):
+        """Returns the filename used for the IC at `address` on bus `bus_id`.
+        """
+        return os.path.join(self.directory, 'i2c-%s-0x%02x.state' % (bus_id, address))
+
+    def load(self, bus_id, address):
+        """Returns `(global_on, pwm_values)` for an IC, or None if nothing is cached.
+        """
+        try:
+            with open(self.path(bus_id, address), 'rb') as f:
+                data = f.read(STATE.size)
+        except IOError:
+            return None
+
+        if len(data) != STATE.size:
+            return None
+
+        magic, global_on, pwm = STATE.unpack(data)
+        if magic != MAGIC:
+            return None
+
+        return bool(global_on), list(pwm)
+
+    def save(self, bus_id, address, global_on, pwm_values):
+        """Record the state of an IC.
+
+        The file is kept open between calls, so saving a frame is a single `pwrite()`.
+        """
+        os.pwrite(self._file(bus_id, address), STATE.pack(MAGIC, 1 if global_on else 0, bytes(pwm_values)), 0)
+
+    def invalidate(self, bus_id, address):
+        """Mark the cached state for an IC as no longer matching its registers, until the next `save()`.
+        """
+        os.pwrite(self._file(bus_id, address), INVALID, 0)
+
+    def _file(self, bus_id, address):
+        key = (bus_id, address)
+        fd = self._files.get(key)
+
+        if fd is None:
+            fd = self._files[key] = os.open(self.path(bus_id, address), os.O_RDWR | os.O_CREAT, 0o644)
+
+        return fd
+
+    def forget(self, bus_id, address):
+        """Remove the cached state for an IC.
+        """
+        fd = self._files.pop((bus_id, address), None)
+        if fd is not None:
+            os.close(fd)
+
+        try:
+            os.unlink(self.path(bus_id, address))
+        except OSError:
+            pass
+
+    def close(self):
+        for fd in self._files.values():
+            os.close(fd)
+        self._files.clear()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+from bisect import bisect_left
+
+
+class BusStats(object):
+    """Counts the i2c traffic and latency of one or more IS31FL3235A ICs.
+
+    Pass an instance as `stats` to IS31FL3235A (several ICs may share one). Every write is counted as one of these operations:
+
+        write_byte
+            A single byte register write.
+
+        write_block
+            A block write of PWM values.
+
+        flush
+            A write to the PWM update register.
+
+        commit
+            A combined transaction holding PWM writes and update register writes, see `IS31FL3235A.write_messages()`.
+
+    Latencies are kept in a histogram per operation. The bucket bounds are in `self.buckets`, in microseconds, with a final bucket for anything slower.
+    """
+    buckets = (50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, 50000)
+
+    def __init__(self):
+        self.hooks = []
+        self.reset()
+
+    def reset(self):
+        """Zero all the counters and histograms.
+        """
+        self.transactions = 0
+        self.bytes = 0
+        self.flushes = 0
+        self.errors = 0
+        self.retries = 0
+        self.hook_errors = 0
+        self.hook_error = None
+        self.histograms = {}
+
+    def add_hook(self, hook):
+        """Call `hook(operation, nbytes, latency, error)` after every write, for exporting to a metrics system.
+
+        `latency` is in seconds and `error` is the exception raised by the bus, or None. Exceptions raised by a hook are counted in `self.hook_errors` and the last one is kept in `self.hook_error`, they never reach the code doing the write.
+        """
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    def record(self, operation, nbytes, latency, error=None):
+        """Record a single write.
+
+        `nbytes` is the number of bytes on the wire, including the address and register bytes.
+        """
+        self.transactions += 1
+        self.bytes += nbytes
+
+        if operation == 'flush':
+            self.flushes += 1
+
+        if error is not None:
+            self.errors += 1
+
+        histogram = self.histograms.get(operation)
+        if histogram is None:
+            histogram = self.histograms[operation] = [0] * (len(self.buckets) + 1)
+        histogram[bisect_left(self.buckets, latency * 1e6)] += 1
+
+        for hook in self.hooks:
+            try:
+                hook(operation, nbytes, latency, error)
+            except Exception as e:
+                # A broken exporter must not turn a good write into a failed one, or hide the bus error
+                self.hook_errors += 1
+                self.hook_error = e
+
+    def as_dict(self):
+        """Returns the counters and histograms as a dictionary, suitable for `json.dumps()`.
+        """
+        labels = ['<=%sus' % bound for bound in self.buckets] + ['>%sus' % self.buckets[-1]]
+
+        return {
+            'transactions': self.transactions,
+            'bytes': self.bytes,
+            'flushes': self.flushes,
+            'errors': self.errors,
+            'retries': self.retries,
+            'latency': {operation: dict(zip(labels, histogram)) for operation, histogram in self.histograms.items()},
+        }
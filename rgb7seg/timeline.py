@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+import struct
+import threading
+from array import array
+from itertools import islice
+from time import monotonic
+
+from .is31fl3235a import FRAME_SIZE
+
+# File format: header followed by `frame count` frames of FRAME_SIZE bytes each
+MAGIC = b'R7TL'
+VERSION = 1
+HEADER = struct.Struct('<4sBfI')  # magic, version, fps, frame count
+
+
+class Timeline(object):
+    """A pre-rendered animation stored as packed PWM register frames.
+
+    Each frame is the 28 PWM register values for a single IS31FL3235A, so replaying a timeline is nothing more than writing the frames to the IC at the right time. Use `Timeline.compile()` to render an effect once and `play()` to replay it as often as you like.
+    """
+    def __init__(self, frames=None, fps=30):
+        """Setup the timeline.
+
+        Options:
+
+            frames
+                An `array('B')` (or any bytes-like object) holding the packed frames.
+
+            fps
+                The frame rate the timeline was rendered for.
+        """
+        self.frames = array('B', frames or b'')
+        self.fps = fps
+        self._frame_lists = None
+
+        if len(self.frames) % FRAME_SIZE:
+            raise ValueError('Timeline data must be a multiple of %s bytes!' % FRAME_SIZE)
+
+    def __len__(self):
+        return len(self.frames) // FRAME_SIZE
+
+    def frame(self, index):
+        """Returns a memoryview of the PWM values for frame `index`.
+        """
+        if not (0 <= index < len(self)):
+            raise IndexError('%s is not a valid frame!' % index)
+
+        return memoryview(self.frames)[index * FRAME_SIZE:(index + 1) * FRAME_SIZE]
+
+    @classmethod
+    def from_registers(cls, registers, fps=30):
+        """Create a timeline from a sequence of 28 byte register frames, such as the output of `rgb7seg.batch.hsv_to_registers()`.
+        """
+        if hasattr(registers, 'tobytes'):
+            return cls(registers.tobytes(), fps)
+
+        return cls(b''.join(bytes(frame) for frame in registers), fps)
+
+    @classmethod
+    def compile(cls, display, effect, fps=30, frames=None):
+        """Render `effect` through `display` into a new timeline.
+
+        Each color yielded by `effect` is rendered by the NumberDisplay `display` for its current character, but nothing is written to the IC. `frames` limits the number of frames rendered, and must be given for effects that never end.
+        """
+        is31fl3235a = display.hsv7seg.is31fl3235a
+        saved_color, saved_leds = display.color, list(is31fl3235a.leds)
+        buffer = array('B')
+
+        if frames is not None:
+            effect = islice(effect, frames)
+
+        try:
+            for color in effect:
+                display.color = color
+                display.render()
+                buffer.extend(is31fl3235a.leds[1:])
+        finally:
+            display.color = saved_color
+            is31fl3235a.leds[:] = saved_leds
+
+        return cls(buffer, fps)
+
+    def play(self, is31fl3235a, fps=None, loop=False, stop=None):
+        """Write the frames to `is31fl3235a` at `fps` frames per second (default: `self.fps`).
+
+        This blocks until the timeline has been played, or forever when `loop` is True. Pass a `threading.Event` as `stop` to end playback from another thread. When playback falls behind, frames are skipped to keep time, but the last frame of a timeline that doesn't loop is always written.
+
+        Returns the number of frames that were skipped.
+        """
+        if not len(self):
+            return 0
+
+        if self._frame_lists is None:
+            # smbus wants lists, so build them once rather than for every frame
+            self._frame_lists = [self.frames[i:i + FRAME_SIZE].tolist() for i in range(0, len(self.frames), FRAME_SIZE)]
+
+        frames = self._frame_lists
+        write_register = is31fl3235a.write_register
+        pwm_register_start = is31fl3235a.pwm_register_start
+        pwm_update_register = is31fl3235a.pwm_update_register
+        stop = stop or threading.Event()
+        interval = 1.0 / (fps or self.fps)
+        deadline = monotonic()
+        dropped = 0
+        frame = None
+
+        try:
+            while not stop.is_set():
+                i = 0
+                while i < len(frames) and not stop.is_set():
+                    frame = frames[i]
+                    write_register(pwm_register_start, frame)
+                    write_register(pwm_update_register, 0)
+
+                    deadline += interval
+                    now = monotonic()
+                    if now < deadline:
+                        stop.wait(deadline - now)
+                        i += 1
+                    else:
+                        missed = int((now - deadline) / interval)
+                        deadline += missed * interval
+                        if not loop and i + 1 < len(frames):
+                            # Never skip the final frame, it is what the IC is left showing
+                            missed = min(missed, len(frames) - 2 - i)
+                        dropped += missed
+                        i += 1 + missed
+
+                if not loop:
+                    break
+        except Exception:
+            # A write failed partway through a frame, so we no longer know what the IC holds
+            is31fl3235a.shadow = None
+            raise
+
+        # Keep the driver's view of the IC in sync with what we wrote
+        if frame is not None:
+            is31fl3235a.leds[1:] = frame
+            is31fl3235a.shadow = list(frame)
+            is31fl3235a._flushed()
+
+        return dropped
+
+    def save(self, path):
+        """Write the timeline to `path`.
+        """
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.fps, len(self)))
+            self.frames.tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        """Read a timeline written by `save()` from `path`.
+        """
+        with open(path, 'rb') as f:
+            magic, version, fps, count = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError('%s is not an rgb7seg timeline!' % path)
+
+            frames = array('B')
+            frames.fromfile(f, count * FRAME_SIZE)
+
+        return cls(frames, fps)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+import atexit
+import threading
+import weakref
+
+# Writers that are still running, closed at interpreter exit so their last frame isn't lost
+_writers = weakref.WeakSet()
+
+
+@atexit.register
+def _close_writers():
+    error = None
+    for writer in list(_writers):
+        try:
+            writer.close()
+        except Exception as e:
+            error = error or e
+
+    if error is not None:
+        raise error
+
+
+class FrameWriter(object):
+    """Writes frames to an IS31FL3235A from a background thread, keeping only the newest one.
+
+    `post()` drops a frame in a mailbox and returns immediately. The writer thread always takes the most recent frame, so when frames are posted faster than the bus can take them the older ones are skipped and counted in `self.coalesced`.
+
+    If a write fails the error is kept in `self.error` and raised by the next `post()`, `flush()` or `close()`. When `flush()` raises it also queues the failed frame again, unless a newer one has been posted, so the next `flush()` retries it.
+
+    The thread is a daemon so it never keeps a program running, but the pending frame is still written when the interpreter exits normally.
+    """
+    def __init__(self, is31fl3235a):
+        self.is31fl3235a = is31fl3235a
+        self.posted = 0
+        self.written = 0
+        self.coalesced = 0
+        self.error = None
+        self._frame = None
+        self._failed = None
+        self._busy = False
+        self._running = True
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='rgb7seg-writer-0x%02X' % is31fl3235a.ic_address, daemon=True)
+        self._thread.start()
+        _writers.add(self)
+
+    def post(self, frame):
+        """Queue a list of 28 PWM values to be written, replacing any frame that hasn't been written yet.
+        """
+        with self._condition:
+            if self.error is not None:
+                error, self.error, self._failed = self.error, None, None
+                raise error
+
+            if self._frame is not None:
+                self.coalesced += 1
+
+            self._frame = frame
+            self.posted += 1
+            self._condition.notify()
+
+    def flush(self, timeout=None):
+        """Wait until the latest frame has been written. Returns False if `timeout` seconds passed first.
+
+        Raises the error if the latest frame couldn't be written, and queues that frame to be tried again.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._frame is None and not self._busy, timeout):
+                return False
+
+            if self.error is not None:
+                error, self.error = self.error, None
+                self._frame, self._failed = self._failed, None
+                self._condition.notify()
+                raise error
+
+            return True
+
+    def close(self):
+        """Write the pending frame, if any, and stop the writer thread.
+
+        Raises the error if the last frame couldn't be written.
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+
+        self._thread.join()
+        _writers.discard(self)
+
+        if self.error is not None:
+            error, self.error, self._failed = self.error, None, None
+            raise error
+
+    def _run(self):
+        condition = self._condition
+
+        while True:
+            with condition:
+                condition.wait_for(lambda: self._frame is not None or not self._running)
+                if self._frame is None:
+                    return
+
+                frame, self._frame = self._frame, None
+                self._busy = True
+
+            error = None
+            try:
+                self.is31fl3235a.write_frame(frame)
+            except Exception as e:
+                error = e
+
+            with condition:
+                if error is None:
+                    self.written += 1
+                    self._failed = None
+                else:
+                    self.error = error
+                    self._failed = frame
+                self._busy = False
+                condition.notify_all()
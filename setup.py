@@ -21,9 +21,13 @@ setup(
     license='MIT',
     author='Zach White',
     author_email='skullydazed@gmail.com',
-    py_modules=['rgb7seg'],
+    packages=['rgb7seg'],
     include_package_data=True,
-    scripts=['rgb7seg_alphabet', 'rgb7seg_breathing', 'rgb7seg_colors', 'rgb7seg_countdown', 'rgb7seg_countup'],
+    extras_require={
+        'numpy': ['numpy'],
+        'smbus2': ['smbus2'],
+    },
+    scripts=['rgb7seg_alphabet', 'rgb7seg_breathing', 'rgb7seg_colors', 'rgb7seg_countdown', 'rgb7seg_countup', 'rgb7seg_countupdown'],
     classifiers=[
         'Development Status :: 5 - Production/Stable',
         'Intended Audience :: Developers',
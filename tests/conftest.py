@@ -0,0 +1,38 @@
+import errno
+
+from rgb7seg import SimulatedBus
+
+
+class FlakyBus(SimulatedBus):
+    """A SimulatedBus with a `bus_id`, where writes to the `(address, register)` pairs in `self.fail` raise an IOError after the write has been counted.
+
+    A combined transaction that includes a failing write has the messages before it written, like a transaction NACKed partway through.
+    """
+    bus_id = 'sim'
+
+    def __init__(self, *args, **kwargs):
+        SimulatedBus.__init__(self, *args, **kwargs)
+        self.fail = set()
+
+    def _transfer(self, address, register, data):
+        if (address, register) in self.fail:
+            self._count(len(data) + 2)
+            raise IOError(errno.EREMOTEIO, 'NACK from 0x%02X!' % address)
+
+        SimulatedBus._transfer(self, address, register, data)
+
+    def write_messages(self, messages):
+        if self.combined and any((address, register) in self.fail for address, register, values in messages):
+            self._count(sum(len(values) + 2 for address, register, values in messages))
+            for address, register, values in messages:
+                if (address, register) in self.fail:
+                    raise IOError(errno.EREMOTEIO, 'NACK from 0x%02X!' % address)
+                self._device(address).write(register, values)
+
+        SimulatedBus.write_messages(self, messages)
+
+
+class NumberedBus(SimulatedBus):
+    """A SimulatedBus standing in for a bus opened by number, so every instance has the same `bus_id`.
+    """
+    bus_id = 1
@@ -0,0 +1,65 @@
+import asyncio
+import gc
+
+from conftest import NumberedBus
+from rgb7seg import SimulatedBus
+from rgb7seg import aio
+
+
+def test_numerals_on_one_physical_bus_share_a_worker_thread():
+    async def main():
+        a = await aio.AsyncNumberDisplay.open(NumberedBus([0x3E]), ic_address=0x3E)
+        b = await aio.AsyncNumberDisplay.open(NumberedBus([0x3F]), ic_address=0x3F)
+        c = await aio.AsyncNumberDisplay.open(SimulatedBus([0x3F]))
+
+        assert a.executor is b.executor
+        assert c.executor is not a.executor
+
+        await a.display(1)
+        await b.display(2)
+
+    asyncio.run(main())
+
+
+def test_worker_threads_go_away_with_their_displays():
+    async def main():
+        numeral = await aio.AsyncNumberDisplay.open(NumberedBus([0x3F]))
+        await numeral.display(8)
+
+    asyncio.run(main())
+    gc.collect()
+
+    assert not aio._executors
+    assert not aio._bus_id_executors
+
+
+def test_close():
+    bus = SimulatedBus([0x3F])
+
+    async def main():
+        numeral = await aio.AsyncNumberDisplay.open(bus)
+        await numeral.display(8)
+        executor = numeral.executor
+        await numeral.close()
+        return executor
+
+    executor = asyncio.run(main())
+
+    assert executor._shutdown
+    assert bus not in aio._executors
+
+
+def test_a_late_fade_still_reaches_its_color():
+    bus = SimulatedBus([0x3F], speed=2000, sleep=True)  # About 20ms a frame
+
+    async def main():
+        numeral = await aio.AsyncNumberDisplay.open(bus)
+        await numeral.display(8, (0, 1, 1))
+        dropped = await numeral.fade((0, 1, 0), duration=0.1, fps=100)
+        return numeral, dropped
+
+    numeral, dropped = asyncio.run(main())
+
+    assert dropped > 0
+    assert numeral.color == (0, 1, 0)
+    assert not any(bus.devices[0x3F].outputs())
@@ -0,0 +1,109 @@
+import itertools
+import time
+
+import pytest
+
+from rgb7seg.animation import Animator, breathing, fade
+
+
+class Recorder(object):
+    """Stands in for a NumberDisplay, remembering every color it is set to.
+    """
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.colors = []
+
+    def set_color(self, color):
+        self.colors.append(color)
+        time.sleep(self.delay)
+
+
+def test_effect_runs_to_the_end():
+    display = Recorder()
+    animator = Animator(display, fps=1000)
+
+    animator.start(range(10))
+    animator.wait(5)
+
+    assert not animator.running
+    assert display.colors[-1] == 9
+    assert display.colors == sorted(display.colors)
+    assert animator.frames + animator.dropped_frames == 10
+
+
+def test_late_frames_are_dropped():
+    display = Recorder(delay=0.05)
+    animator = Animator(display, fps=100)
+
+    animator.start(range(20))
+    animator.wait(5)
+
+    # Every frame takes five slots, so the frames in between are skipped to keep time
+    assert animator.dropped_frames > 0
+    assert animator.frames + animator.dropped_frames <= 20
+    assert display.colors == sorted(display.colors)
+    assert len(display.colors) == animator.frames
+
+
+@pytest.mark.parametrize('frames', [9, 11, 13])
+def test_late_effects_still_end_on_their_last_frame(frames):
+    display = Recorder(delay=0.035)
+    animator = Animator(display, fps=100)
+
+    animator.start(fade((0, 1, 1), (0, 1, 0), duration=(frames - 1) / 100.0, fps=100))
+    animator.wait(5)
+
+    assert animator.dropped_frames > 0
+    assert display.colors[-1] == (0, 1, 0)
+    assert animator.frames + animator.dropped_frames == frames
+
+
+def test_start_replaces_the_running_effect():
+    display = Recorder()
+    animator = Animator(display, fps=1000)
+
+    animator.start(itertools.repeat('old'))
+    first = animator._thread
+    animator.start(['new'])
+    animator.wait(5)
+
+    assert not first.is_alive()
+    assert display.colors[-1] == 'new'
+    assert animator.frames == 1
+
+
+def test_stop():
+    animator = Animator(Recorder(), fps=1000)
+
+    animator.start(itertools.count())
+    animator.stop()
+
+    assert not animator.running
+    animator.stop()  # Stopping twice is harmless
+
+
+@pytest.mark.filterwarnings('ignore::pytest.PytestUnhandledThreadExceptionWarning')
+def test_errors_end_the_effect():
+    def apply(frame):
+        raise ValueError(frame)
+
+    animator = Animator(Recorder(), fps=1000, apply=apply)
+    animator.start([1, 2])
+    animator.wait(5)
+
+    assert isinstance(animator.error, ValueError)
+    assert animator.frames == 0
+
+
+def test_fade_reaches_the_end_color():
+    frames = list(fade((0, 1, 0), (0, 1, 1), duration=1, fps=4))
+
+    assert frames[0] == (0, 1, 0)
+    assert frames[-1] == (0, 1, 1)
+    assert len(frames) == 5
+
+
+def test_breathing_rises_and_falls():
+    frames = list(itertools.islice(breathing((0.5, 1), fps=2, top_pause=0, bottom_pause=0, random_colors=False), 6))
+
+    assert [value for hue, saturation, value in frames] == [0, 0.5, 1, 1, 0.5, 0]
@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from rgb7seg import SimulatedBus
+from rgb7seg import batch
+from rgb7seg.hsv7segment import HSV7Segment
+from rgb7seg.is31fl3235a import IS31FL3235A
+from rgb7seg.timeline import Timeline
+
+
+def random_frames(count, segments=8):
+    rng = random.Random(1)
+    return [[(rng.random(), rng.random(), rng.random()) for segment in range(segments)] for frame in range(count)]
+
+
+def test_python_matches_render():
+    hsv = random_frames(20)
+    frames = batch.hsv_to_registers(hsv, use_numpy=False)
+    numeral = HSV7Segment(i2c_bus=SimulatedBus([0x3F]), ic_address=0x3F, buffered=True)
+
+    for colors, registers in zip(hsv, frames):
+        numeral.set_segments(colors)
+        numeral.render()
+        assert list(registers) == numeral.is31fl3235a.leds[1:]
+
+
+@pytest.mark.skipif(batch.numpy is None, reason='NumPy is not installed')
+def test_numpy_matches_python():
+    hsv = random_frames(200) + [[(0, 0, 0)] * 8, [(1, 1, 1)] * 8]
+
+    registers = batch.hsv_to_registers(hsv, use_numpy=True)
+
+    assert registers.dtype == batch.numpy.uint8
+    assert registers.shape == (len(hsv), 28)
+    assert registers.tobytes() == b''.join(batch.hsv_to_registers(hsv, use_numpy=False))
+
+
+@pytest.mark.parametrize('use_numpy', [False, pytest.param(True, marks=pytest.mark.skipif(batch.numpy is None, reason='NumPy is not installed'))])
+def test_frames_can_be_written(use_numpy):
+    bus = SimulatedBus([0x3F])
+    ic = IS31FL3235A(0x3F, bus, buffered=True)
+    frame = batch.hsv_to_registers([[(0.25, 1, 1)] * 8], use_numpy=use_numpy)[0]
+
+    ic.write_register(ic.pwm_register_start, list(frame))
+    ic.flush()
+    assert bus.devices[0x3F].pwm == list(bytes(frame))
+
+
+@pytest.mark.parametrize('use_numpy', [False, pytest.param(True, marks=pytest.mark.skipif(batch.numpy is None, reason='NumPy is not installed'))])
+def test_timeline_from_registers(use_numpy):
+    hsv = random_frames(5)
+    timeline = Timeline.from_registers(batch.hsv_to_registers(hsv, use_numpy=use_numpy))
+
+    assert len(timeline) == 5
+    assert timeline.frame(4).tobytes() == bytes(batch.hsv_to_registers(hsv, use_numpy=False)[4])
+
+
+@pytest.mark.parametrize('use_numpy', [False, pytest.param(True, marks=pytest.mark.skipif(batch.numpy is None, reason='NumPy is not installed'))])
+def test_out_of_range(use_numpy):
+    with pytest.raises(ValueError):
+        batch.hsv_to_registers([[(0, 2, 1)]], use_numpy=use_numpy)
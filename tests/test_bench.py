@@ -0,0 +1,23 @@
+import json
+
+from rgb7seg import bench
+
+
+def test_main_writes_every_scenario(tmp_path):
+    path = str(tmp_path / 'bench.json')
+
+    bench.main(['-n', '5', '-o', path, 'display_char', 'multi_numeral'])
+
+    with open(path) as f:
+        results = json.load(f)
+
+    assert set(results) == {'python', 'platform', 'bus_speed', 'combined', 'results'}
+    assert [result['scenario'] for result in results['results']] == ['display_char', 'multi_numeral']
+
+    for result in results['results']:
+        assert set(result) == {
+            'scenario', 'iterations', 'frames_per_second', 'cpu_us_per_frame', 'stages_us_per_frame', 'stage_calls_per_frame',
+            'i2c_transactions_per_frame', 'i2c_bytes_per_frame', 'i2c_bus_us_per_frame',
+        }
+        assert result['iterations'] == 5
+        assert result['i2c_bytes_per_frame'] > 0
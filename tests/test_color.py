@@ -0,0 +1,44 @@
+import pytest
+
+from rgb7seg import SimulatedBus
+from rgb7seg.color import ColorConverter
+from rgb7seg.hsv7segment import HSV7Segment
+
+
+def test_tables_apply_gamma():
+    converter = ColorConverter((1, 2, 3), resolution=100)
+
+    assert converter.tables[0][50] == 128
+    assert converter.tables[1][50] == 64
+    assert converter.tables[2][50] == 32
+    assert converter.hsv2pwm((0, 0, 1)) == (255, 255, 255)
+    assert converter.hsv2pwm((0, 0, 0)) == (0, 0, 0)
+    assert converter.hsv2pwm((0, 1, 0.5)) == (128, 0, 0)
+
+
+def test_dim_colors_are_still_visible():
+    assert ColorConverter().hsv2pwm((0, 1, 0.16)) == (3, 0, 0)
+
+
+def test_changing_gamma_rebuilds_the_tables():
+    converter = ColorConverter((1, 1, 1))
+    assert converter.hsv2pwm((0, 0, 0.5)) == (128, 128, 128)
+
+    converter.gamma_correction = (2, 2, 2)
+    assert converter.hsv2pwm((0, 0, 0.5)) == (64, 64, 64)
+
+
+def test_gamma_setters_on_hsv7segment():
+    numeral = HSV7Segment(i2c_bus=SimulatedBus([0x3F]), ic_address=0x3F)
+
+    numeral.gamma_g = 1
+    assert numeral.gamma_correction == (2.5, 1.0, 2.4)
+    assert numeral.converter.hsv2pwm((0.33333333, 1, 0.5)) == (0, 128, 0)
+
+
+def test_out_of_range_is_refused():
+    with pytest.raises(ValueError):
+        ColorConverter().hsv2pwm((0, 2, 1))
+
+    with pytest.raises(ValueError):
+        ColorConverter((1, 2))
@@ -0,0 +1,83 @@
+import threading
+from time import monotonic, sleep
+
+from rgb7seg import DisplayArray, NumberDisplay, SimulatedBus
+from rgb7seg.counter import Counter, counting
+
+
+def test_counting_up_and_down():
+    assert [value for value, color in counting(8, 11)] == [8, 9, 10, 11]
+    assert [value for value, color in counting(3, 0)] == [3, 2, 1, 0]
+
+
+def test_counting_thresholds():
+    red, yellow, green = (0, 1, 0.5), (0.16, 1, 0.5), (0.33, 1, 0.5)
+
+    assert list(counting(8, 2, red, [(6, green), (3, yellow)])) == [
+        (8, green), (7, green), (6, yellow), (5, yellow), (4, yellow), (3, red), (2, red),
+    ]
+
+
+def test_run_shows_every_value():
+    bus = SimulatedBus([0x3F])
+    numeral = NumberDisplay(i2c_bus=bus, ic_address=0x3F)
+    counter = Counter(numeral, interval=0.001)
+
+    assert counter.run(counting(0, 9, numeral.colors['red'])) == 10
+    assert bus.devices[0x3F].flushes == 11  # Setup, then one per tick
+    assert counter.max_jitter >= counter.mean_jitter >= 0
+
+    numeral.display(9, numeral.colors['red'])
+    assert bus.devices[0x3F].flushes == 11  # The last tick was already showing 9
+
+
+def test_run_on_an_array():
+    addresses = [0x3E, 0x3F]
+    bus = SimulatedBus(addresses)
+    array = DisplayArray(addresses, bus)
+
+    Counter(array, interval=0.001).run(counting(8, 12, array.colors['red']))
+
+    expected = DisplayArray(addresses, SimulatedBus(addresses))
+    expected.display('12', array.colors['red'])
+    for address in addresses:
+        assert bus.devices[address].pwm == expected.i2c_bus.devices[address].pwm
+
+
+class SlowDisplay(object):
+    """Stands in for a NumberDisplay whose bus writes take `delay` seconds.
+    """
+    def __init__(self, delay):
+        self.delay = delay
+        self.shown = []
+        self.text = None
+
+    def set_character(self, text):
+        self.text = text
+
+    def render(self):
+        pass
+
+    def commit(self):
+        sleep(self.delay)
+        self.shown.append(self.text)
+
+
+def test_slow_writes_dont_add_up():
+    display = SlowDisplay(0.02)
+    start = monotonic()
+
+    Counter(display, interval=0.03).run(counting(1, 5))
+
+    # Five ticks take five intervals, not five intervals plus five writes
+    assert display.shown == [1, 2, 3, 4, 5]
+    assert monotonic() - start < 5 * 0.03 + 0.05
+
+
+def test_stop_ends_the_count():
+    display = SlowDisplay(0)
+    stop = threading.Event()
+    stop.set()
+
+    assert Counter(display, interval=10).run(counting(1, 5), stop) == 1
+    assert display.shown == [1]
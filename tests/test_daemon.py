@@ -0,0 +1,96 @@
+import errno
+
+import pytest
+
+from rgb7seg import NumberDisplay, SimulatedBus
+from rgb7seg.client import NumberDisplayClient
+from rgb7seg.daemon import CMD_COLOR, HEADER, DisplayDaemon, pack_color, unpack_color
+
+
+@pytest.fixture
+def bus():
+    return SimulatedBus([0x3E, 0x3F])
+
+
+@pytest.fixture
+def daemon(tmp_path, bus):
+    daemon = DisplayDaemon(str(tmp_path / 'rgb7seg.sock'), [0x3E, 0x3F], bus)
+    yield daemon
+    daemon.close()
+
+
+def serve(daemon, messages):
+    """Handle events until `messages` messages have arrived in total.
+    """
+    while daemon.messages < messages:
+        daemon.handle_events(timeout=5)
+
+
+def test_color_round_trip():
+    color = unpack_color(pack_color((0.5, 1, 0.25)))
+
+    assert color == pytest.approx((0.5, 1, 0.25), abs=1e-4)
+
+
+def test_frame(daemon, bus):
+    with NumberDisplayClient(0x3E, daemon.socket_path) as client:
+        client.write_frame(range(28))
+        serve(daemon, 1)
+
+    assert bus.devices[0x3E].pwm == list(range(28))
+    assert not any(bus.devices[0x3F].pwm)
+
+
+def test_character(daemon, bus):
+    reference = SimulatedBus([0x3F])
+    NumberDisplay(reference, 0x3F).display(7, (0, 1, 1))
+
+    with NumberDisplayClient(0x3F, daemon.socket_path) as client:
+        client.display(7, (0, 1, 1))
+        serve(daemon, 1)
+
+    assert bus.devices[0x3F].outputs() == reference.devices[0x3F].outputs()
+
+
+def test_messages_that_arrive_together_are_one_frame(daemon, bus):
+    client = NumberDisplayClient(0x3F, daemon.socket_path)
+    daemon.handle_events(timeout=5)  # Accept the connection
+
+    for value in range(1, 4):
+        client.write_frame([value] * 28)
+    client.set_color((0, 1, 1))
+    client.write_frame([9] * 28)
+    serve(daemon, 5)
+
+    assert daemon.frames == 1
+    assert bus.devices[0x3F].flushes == 2  # Setup, then the frame
+    assert bus.devices[0x3F].pwm == [9] * 28
+    client.close()
+
+
+def test_bad_messages_are_counted_and_skipped(daemon, bus):
+    client = NumberDisplayClient(0x3F, daemon.socket_path)
+    client.socket.sendall(HEADER.pack(99, 0x3F, 0))                       # Unknown command
+    client.socket.sendall(HEADER.pack(CMD_COLOR, 0x10, 6) + bytes(6))    # No numeral at that address
+    client.socket.sendall(HEADER.pack(CMD_COLOR, 0x3F, 2) + bytes(2))    # Short payload
+    client.write_frame([4] * 28)
+    serve(daemon, 4)
+
+    assert daemon.errors == 3
+    assert bus.devices[0x3F].pwm == [4] * 28
+    client.close()
+
+
+def test_refuses_to_replace_a_running_daemon(daemon, bus):
+    with pytest.raises(IOError) as error:
+        DisplayDaemon(daemon.socket_path, [0x3F], bus)
+
+    assert error.value.errno == errno.EADDRINUSE
+
+
+def test_replaces_a_stale_socket(tmp_path, bus):
+    path = str(tmp_path / 'rgb7seg.sock')
+    DisplayDaemon(path, [0x3F], bus).server.close()  # Gone without cleaning up
+
+    daemon = DisplayDaemon(path, [0x3F], bus)
+    daemon.close()
@@ -0,0 +1,105 @@
+import itertools
+
+import pytest
+
+from rgb7seg import NumberDisplay, SimulatedBus
+from rgb7seg import effects
+from rgb7seg.effects import BLANK, blink, crossfade, fade, glyph_frame, mix, overlay, rainbow_chase, sequence, still, time_scale
+
+RED = (0, 1, 1)
+BLUE = (0.66666666, 1, 1)
+
+
+def test_glyph_frame():
+    assert glyph_frame('1', RED) == (None, RED, RED, None, None, None, None, None)
+    assert glyph_frame('', RED, color_off=BLUE, dp=True) == (BLUE,) * 7 + (RED,)
+
+
+def test_mix_takes_the_short_way_around_the_hue_wheel():
+    assert mix((0.9, 1, 1), (0.1, 1, 1), 0.5) == pytest.approx((0, 1, 1))
+    assert mix(None, RED, 0.5) == (0, 1, 0.5)
+    assert mix(RED, None, 1) == (0, 1, 0)
+    assert mix(None, None, 0.5) is None
+
+
+def test_still_and_sequence():
+    frames = list(sequence(still('a', 1, fps=2), still('b', 0.5, fps=2)))
+
+    assert frames == ['a', 'a', 'b']
+
+
+def test_fade_reaches_the_end_color():
+    frames = list(fade('8', (0, 1, 0), RED, duration=1, fps=4))
+
+    assert len(frames) == 5
+    assert frames[0][0] == (0, 1, 0)
+    assert frames[-1][0] == RED
+
+
+def test_crossfade_ends_on_the_end_effect():
+    start = still(glyph_frame('8', (0, 1, 0)), 1, fps=4)
+    end = still(glyph_frame('8', RED), 1, fps=4)
+
+    frames = list(crossfade(start, end, duration=1, fps=4))
+
+    assert len(frames) == 4
+    assert frames[0][0] == (0, 1, 0)
+    assert frames[-1] == glyph_frame('8', RED)
+
+
+def test_crossfade_carries_on_with_the_end_effect():
+    end = itertools.chain(still(glyph_frame('1', RED), 1, fps=2), [glyph_frame('2', BLUE)])
+
+    frames = list(crossfade(still(BLANK), end, duration=1, fps=2))
+
+    assert frames[-1] == glyph_frame('2', BLUE)
+
+
+def test_blink():
+    frames = list(blink(still('x', 2, fps=2), on_time=0.5, off_time=0.5, fps=2))
+
+    assert frames == ['x', BLANK, 'x', BLANK]
+
+
+def test_overlay_shows_what_is_below_transparent_segments():
+    bottom = still(glyph_frame('8', RED), 1, fps=2)
+    top = [glyph_frame('1', BLUE)]
+
+    frames = list(overlay(bottom, top))
+
+    assert frames[0][:3] == (RED, BLUE, BLUE)
+    assert frames[1] == glyph_frame('8', RED)  # The top effect has ended
+
+
+def test_time_scale():
+    assert list(time_scale(range(6), 2)) == [0, 2, 4]
+    assert list(time_scale(range(3), 0.5)) == [0, 0, 1, 1, 2, 2]
+
+
+def test_effects_are_lazy():
+    show = time_scale(rainbow_chase('8', fps=10), 3)
+
+    assert len(list(itertools.islice(show, 100))) == 100
+
+
+def test_play_on_a_number_display():
+    bus = SimulatedBus([0x3F])
+    numeral = NumberDisplay(i2c_bus=bus, ic_address=0x3F)
+
+    effects.play(numeral, [glyph_frame('1', RED)], fps=1000)
+
+    assert numeral.segments_enabled == 0b110
+    assert sum(1 for value in bus.devices[0x3F].outputs() if value) == 2  # Two red LEDs
+
+
+def test_play_ends_on_the_last_frame_on_a_slow_bus():
+    bus = SimulatedBus([0x3F], speed=2000, sleep=True)  # About 35ms a frame
+    numeral = NumberDisplay(i2c_bus=bus, ic_address=0x3F)
+    start = still(glyph_frame('8', RED), 0.05, fps=100)
+    end = still(glyph_frame('1', BLUE), 0.1, fps=100)
+
+    effects.play(numeral, crossfade(start, end, duration=0.1, fps=100), fps=100)
+
+    reference = SimulatedBus([0x3F])
+    effects.play(NumberDisplay(i2c_bus=reference, ic_address=0x3F), [glyph_frame('1', BLUE)], fps=100)
+    assert bus.devices[0x3F].outputs() == reference.devices[0x3F].outputs()
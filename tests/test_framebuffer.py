@@ -0,0 +1,141 @@
+import errno
+import threading
+import time
+
+import pytest
+
+from rgb7seg import SimulatedBus
+from rgb7seg.framebuffer import SEQUENCE, FrameBuffer, Flusher
+
+
+@pytest.fixture
+def framebuffer(tmp_path):
+    framebuffer = FrameBuffer.create(str(tmp_path / 'fb'), [0x3E, 0x3F])
+    yield framebuffer
+    framebuffer.close()
+
+
+def test_create_and_open(framebuffer):
+    other = FrameBuffer(framebuffer.path)
+
+    assert other.addresses == [0x3E, 0x3F]
+    assert other.read(0) == (0, bytes(28))
+    other.close()
+
+
+def test_write_bumps_the_sequence_by_two(framebuffer):
+    with framebuffer.write(0x3F) as pwm:
+        assert framebuffer.sequence(1) == 1
+        assert framebuffer.read(1) is None  # A producer is writing, the flusher skips the slot
+        pwm[0:3] = bytes((1, 2, 3))
+
+    assert framebuffer.read(1) == (2, bytes((1, 2, 3)) + bytes(25))
+    assert framebuffer.read(0) == (0, bytes(28))
+
+
+def test_failed_write_is_rolled_back(framebuffer):
+    framebuffer.set_frame(0x3F, [7] * 28)
+
+    with pytest.raises(RuntimeError):
+        with framebuffer.write(0x3F) as pwm:
+            pwm[0:3] = bytes((1, 2, 3))
+            raise RuntimeError
+
+    assert framebuffer.read(1) == (4, bytes([7] * 28))
+
+
+def test_failed_write_is_flushed_again(framebuffer):
+    bus = SimulatedBus([0x3E, 0x3F])
+    flusher = Flusher(framebuffer, bus)
+    framebuffer.set_frame(0x3F, [7] * 28)
+    flusher.flush()
+    before = framebuffer.sequence(1)
+
+    with pytest.raises(RuntimeError):
+        with framebuffer.write(0x3F) as pwm:
+            pwm[0:3] = bytes((1, 2, 3))
+            raise RuntimeError
+
+    # A flusher that copied the slot mid-write must not see the same sequence number afterwards
+    assert framebuffer.sequence(1) == before + 2
+    assert flusher.flush() == 1
+    assert bus.devices[0x3F].pwm == [7] * 28
+
+
+def test_write_recovers_from_a_producer_that_died_mid_write(framebuffer):
+    bus = SimulatedBus([0x3E, 0x3F])
+    flusher = Flusher(framebuffer, bus)
+    flusher.flush()
+
+    SEQUENCE.pack_into(framebuffer.mmap, framebuffer.offset(1), 1)  # Killed inside write(), the slot stays odd
+    assert framebuffer.read(1) is None
+
+    framebuffer.set_frame(0x3F, [7] * 28)
+    assert framebuffer.sequence(1) == 4
+    assert flusher.flush() == 1
+    assert bus.devices[0x3F].pwm == [7] * 28
+
+
+def test_close_after_write(framebuffer):
+    with framebuffer.write(0x3F) as pwm:
+        pwm[0] = 1
+
+    framebuffer.close()
+
+
+def test_flusher_writes_changed_slots(framebuffer):
+    bus = SimulatedBus([0x3E, 0x3F])
+    flusher = Flusher(framebuffer, bus)
+
+    assert flusher.flush() == 2  # The first flush writes every slot
+    assert flusher.flush() == 0
+
+    framebuffer.set_frame(0x3F, range(28))
+    assert flusher.flush() == 1
+    assert bus.devices[0x3F].pwm == list(range(28))
+    assert bus.devices[0x3E].pwm == [0] * 28
+
+    assert flusher.flush() == 0
+
+
+@pytest.mark.parametrize('combined', [True, False])
+def test_flusher_retries_a_failed_slot(framebuffer, combined):
+    bus = SimulatedBus([0x3E, 0x3F], combined=combined)
+    flusher = Flusher(framebuffer, bus)
+    framebuffer.set_frame(0x3E, [5] * 28)
+    framebuffer.set_frame(0x3F, [6] * 28)
+
+    device = bus.devices.pop(0x3E)
+    with pytest.raises(IOError) as error:
+        flusher.flush()
+    assert error.value.errno == errno.EREMOTEIO
+
+    bus.devices[0x3E] = device
+    assert flusher.flush() >= 1
+    assert bus.devices[0x3E].pwm == [5] * 28
+    assert bus.devices[0x3F].pwm == [6] * 28
+
+
+def test_run_survives_bus_errors(framebuffer):
+    bus = SimulatedBus([0x3E, 0x3F])
+    flusher = Flusher(framebuffer, bus, fps=1000)
+    framebuffer.set_frame(0x3F, [6] * 28)
+    device = bus.devices.pop(0x3F)
+
+    stop = threading.Event()
+    thread = threading.Thread(target=flusher.run, args=(stop,))
+    thread.start()
+    try:
+        while flusher.errors < 2:
+            time.sleep(0.001)
+        assert thread.is_alive()
+
+        bus.devices[0x3F] = device
+        deadline = time.monotonic() + 5
+        while device.pwm != [6] * 28 and time.monotonic() < deadline:
+            time.sleep(0.001)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert device.pwm == [6] * 28
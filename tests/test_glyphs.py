@@ -0,0 +1,81 @@
+import string
+
+from rgb7seg import NumberDisplay, SimulatedBus
+from rgb7seg.glyphs import A, B, C, CHARACTERS, DP, SEGMENTS, glyph
+
+# The per-instance table NumberDisplay used before glyphs were stored as masks
+OLD_CHARACTERS = {
+    '': {'a': False, 'b': False, 'c': False, 'd': False, 'e': False, 'f': False, 'g': False},
+    '0': {'a': True, 'b': True, 'c': True, 'd': True, 'e': True, 'f': True, 'g': False},
+    '1': {'a': False, 'b': True, 'c': True, 'd': False, 'e': False, 'f': False, 'g': False},
+    '2': {'a': True, 'b': True, 'c': False, 'd': True, 'e': True, 'f': False, 'g': True},
+    '3': {'a': True, 'b': True, 'c': True, 'd': True, 'e': False, 'f': False, 'g': True},
+    '4': {'a': False, 'b': True, 'c': True, 'd': False, 'e': False, 'f': True, 'g': True},
+    '5': {'a': True, 'b': False, 'c': True, 'd': True, 'e': False, 'f': True, 'g': True},
+    '6': {'a': True, 'b': False, 'c': True, 'd': True, 'e': True, 'f': True, 'g': True},
+    '7': {'a': True, 'b': True, 'c': True, 'd': False, 'e': False, 'f': False, 'g': False},
+    '8': {'a': True, 'b': True, 'c': True, 'd': True, 'e': True, 'f': True, 'g': True},
+    '9': {'a': True, 'b': True, 'c': True, 'd': True, 'e': False, 'f': True, 'g': True},
+    'A': {'a': True, 'b': True, 'c': True, 'd': False, 'e': True, 'f': True, 'g': True},
+    'C': {'a': True, 'b': False, 'c': False, 'd': True, 'e': True, 'f': True, 'g': False},
+    'E': {'a': True, 'b': False, 'c': False, 'd': True, 'e': True, 'f': True, 'g': True},
+    'F': {'a': True, 'b': False, 'c': False, 'd': False, 'e': True, 'f': True, 'g': True},
+    'H': {'a': False, 'b': True, 'c': True, 'd': False, 'e': True, 'f': True, 'g': True},
+    'J': {'a': False, 'b': True, 'c': True, 'd': True, 'e': True, 'f': False, 'g': False},
+    'L': {'a': False, 'b': False, 'c': False, 'd': True, 'e': True, 'f': True, 'g': False},
+    'P': {'a': True, 'b': True, 'c': False, 'd': False, 'e': True, 'f': True, 'g': True},
+    'R': {'a': True, 'b': True, 'c': True, 'd': False, 'e': True, 'f': True, 'g': True},
+    'U': {'a': False, 'b': True, 'c': True, 'd': True, 'e': True, 'f': True, 'g': False},
+}
+for _alias, _character in (('B', '8'), ('D', '0'), ('G', '6'), ('I', '1'), ('K', 'H'), ('M', 'H'), ('N', 'H'), ('O', '0'), ('Q', '0'), ('S', '5'), ('T', '7'), ('V', 'U'), ('W', 'U'), ('X', 'H'), ('Y', '4'), ('Z', '2')):
+    OLD_CHARACTERS[_alias] = OLD_CHARACTERS[_character]
+
+
+def old_mask(character):
+    """The segment mask the old table gave `character`, which was upper cased and shown blank when unknown.
+    """
+    segments = OLD_CHARACTERS.get(str(character).upper(), OLD_CHARACTERS[''])
+
+    return sum(1 << bit for bit, segment in enumerate(SEGMENTS[:7]) if segments[segment])
+
+
+def test_glyphs_match_the_old_table():
+    added = {'-', '_'}  # Not in the old table
+
+    for character in list(string.printable) + ['', 8, 'AB', 'é']:
+        if character not in added:
+            assert glyph(character) == old_mask(character), repr(character)
+
+
+def test_display_lights_the_glyph():
+    bus = SimulatedBus([0x3F])
+    numeral = NumberDisplay(i2c_bus=bus, ic_address=0x3F)
+
+    for character in '0123456789AbCdEFHJLPrU':
+        numeral.display(character, numeral.colors['red'])
+        lit = [i for i, segment in enumerate(numeral.hsv7seg.segment_list) if any(bus.devices[0x3F].outputs()[led - 1] for led in segment.leds)]
+        assert sum(1 << i for i in lit) == old_mask(character), character
+
+
+def test_decimal_point():
+    bus = SimulatedBus([0x3F])
+    numeral = NumberDisplay(i2c_bus=bus, ic_address=0x3F)
+
+    numeral.set_character('1', dp=True)
+    assert numeral.segments_enabled == glyph('1') | DP
+
+
+def test_glyph_table_is_shared():
+    a = NumberDisplay(i2c_bus=SimulatedBus([0x3F]), ic_address=0x3F)
+    b = NumberDisplay(i2c_bus=SimulatedBus([0x3F]), ic_address=0x3F)
+
+    assert a.characters is b.characters is CHARACTERS
+
+    a.set_character('7')
+    assert a.segments_enabled == A | B | C
+    assert b.segments_enabled == 0
+
+
+def test_lower_case_and_unknown_characters():
+    assert glyph('b') == glyph('B') == CHARACTERS['8']
+    assert glyph('~') == glyph(chr(300)) == glyph('12') == 0
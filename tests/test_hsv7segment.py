@@ -0,0 +1,55 @@
+import pytest
+
+from rgb7seg import SimulatedBus
+from rgb7seg.hsv7segment import HSV7Segment
+
+
+def test_frame_writes_once_on_exit():
+    bus = SimulatedBus([0x3F])
+    numeral = HSV7Segment(i2c_bus=bus, ic_address=0x3F)
+    bus.reset_counters()
+
+    with numeral.frame():
+        numeral.a = [0, 1, 1]
+        numeral.d = [0, 1, 1]
+        assert bus.transactions == 0
+
+    assert bus.transactions == 1
+    assert any(bus.devices[0x3F].outputs())
+
+
+def test_frame_recovers_when_render_fails():
+    bus = SimulatedBus([0x3F])
+    numeral = HSV7Segment(i2c_bus=bus, ic_address=0x3F)
+    bus.reset_counters()
+
+    with pytest.raises(ValueError):
+        with numeral.frame():
+            numeral.a = [0, 2, 1]  # Saturation out of range, only noticed by render()
+
+    assert bus.transactions == 0
+
+    # Unbuffered writes go straight to the IC again
+    numeral.is31fl3235a[1] = 5
+    assert bus.devices[0x3F].pwm[0] == 5
+
+
+def test_nested_frames_write_once():
+    bus = SimulatedBus([0x3F])
+    numeral = HSV7Segment(i2c_bus=bus, ic_address=0x3F)
+    bus.reset_counters()
+
+    with numeral.frame() as outer:
+        with numeral.frame():
+            numeral.a = [0, 1, 1]
+        assert bus.transactions == 0
+        assert outer is numeral
+
+    assert bus.transactions == 1
+
+
+def test_only_frame_is_a_context_manager():
+    numeral = HSV7Segment(i2c_bus=SimulatedBus([0x3F]), ic_address=0x3F)
+
+    assert not hasattr(numeral, '__enter__')
+    assert not hasattr(numeral.is31fl3235a, '__enter__')
@@ -0,0 +1,37 @@
+import pytest
+
+from conftest import NumberedBus
+from rgb7seg import NumberDisplay, SimulatedBus
+from rgb7seg.multibus import MultiBusController
+
+
+def test_numerals_are_grouped_by_physical_bus():
+    controller = MultiBusController([NumberDisplay(NumberedBus([0x3E]), 0x3E), NumberDisplay(NumberedBus([0x3F]), 0x3F), NumberDisplay(SimulatedBus([0x3F]))])
+
+    assert [len(group) for group in controller.groups] == [2, 1]
+    controller.close()
+
+
+@pytest.mark.parametrize('combined', [True, False])
+def test_commit_latches_every_bus(combined):
+    buses = [SimulatedBus([0x3F], combined=combined) for i in range(3)]
+    controller = MultiBusController([NumberDisplay(bus) for bus in buses])
+
+    controller.display('888', controller.colors['red'])
+
+    for bus in buses:
+        assert any(bus.devices[0x3F].outputs())
+    controller.close()
+
+
+@pytest.mark.parametrize('combined', [True, False])
+def test_a_failing_bus_doesnt_stop_the_others(combined):
+    good, bad = SimulatedBus([0x3F], combined=combined), SimulatedBus([0x3F], combined=combined)
+    controller = MultiBusController([NumberDisplay(good), NumberDisplay(bad)])
+    bad.devices.clear()  # Nothing answers on this bus any more
+
+    with pytest.raises(IOError):
+        controller.display('88', controller.colors['red'])
+
+    assert any(good.devices[0x3F].outputs())
+    controller.close()
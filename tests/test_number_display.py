@@ -0,0 +1,76 @@
+from rgb7seg import NumberDisplay, SimulatedBus
+
+
+def numeral(**kwargs):
+    return NumberDisplay(i2c_bus=SimulatedBus([0x3F]), ic_address=0x3F, **kwargs)
+
+
+def test_frame_cache_hits_and_misses():
+    display = numeral()
+    red, blue = display.colors['red'], display.colors['blue']
+
+    display.display(1, red)
+    display.display(2, red)
+    display.display(1, blue)
+    assert (display.frame_cache_hits, display.frame_cache_misses) == (0, 3)
+
+    leds = display.hsv7seg.is31fl3235a.leds[1:]
+    display.display(2, red)
+    display.display(1, blue)
+    assert (display.frame_cache_hits, display.frame_cache_misses) == (2, 3)
+    assert display.hsv7seg.is31fl3235a.leds[1:] == leds
+    assert display.hsv7seg.is31fl3235a.i2c_bus.devices[0x3F].outputs() == leds
+
+
+def test_frame_cache_evicts_the_least_recently_used():
+    display = numeral(frame_cache_size=2)
+    red = display.colors['red']
+
+    display.display(1, red)
+    display.display(2, red)
+    display.display(1, red)  # 1 is now the most recently used
+    display.display(3, red)  # so 2 is evicted
+
+    assert len(display.frame_cache) == 2
+    display.display(1, red)
+    assert display.frame_cache_hits == 2
+    display.display(2, red)
+    assert display.frame_cache_misses == 4
+
+
+def test_frame_cache_is_cleared_when_gamma_changes():
+    display = numeral()
+    red = display.colors['red']
+
+    display.display(8, red)
+    before = display.hsv7seg.is31fl3235a.leds[1:]
+
+    display.hsv7seg.gamma_r = 1
+    display.display(8, red)
+
+    assert display.frame_cache_hits == 0
+    assert display.hsv7seg.is31fl3235a.leds[1:] != before
+
+
+def test_frame_cache_is_cleared_when_color_off_changes():
+    display = numeral()
+    red = display.colors['red']
+
+    display.display(1, red)
+    lit = sum(1 for value in display.hsv7seg.is31fl3235a.leds[1:] if value)
+
+    display.color_off = display.colors['blue']
+    display.display(1, red)
+
+    assert display.frame_cache_hits == 0
+    assert sum(1 for value in display.hsv7seg.is31fl3235a.leds[1:] if value) > lit  # The other segments are blue now
+
+
+def test_frame_cache_can_be_turned_off():
+    display = numeral(frame_cache_size=0)
+
+    display.display(1, display.colors['red'])
+    display.display(1, display.colors['red'])
+
+    assert not display.frame_cache
+    assert display.frame_cache_misses == 0
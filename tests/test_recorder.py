@@ -0,0 +1,139 @@
+import struct
+
+import pytest
+
+from conftest import FlakyBus
+from rgb7seg import DisplayArray, SimulatedBus
+from rgb7seg.recorder import HEADER, RECORD, WRITE_BLOCK, WRITE_BYTE, WRITE_CONTINUED, Recording, RecordingBus
+
+ADDRESSES = [0x3E, 0x3F]
+
+
+class RawSMBus(object):
+    """Stands in for an `smbus.SMBus`, which has no `bus_id` or `combined`.
+    """
+    def __init__(self):
+        self.writes = []
+
+    def write_byte_data(self, address, register, value):
+        self.writes.append((address, register, [value]))
+
+    def write_i2c_block_data(self, address, register, values):
+        self.writes.append((address, register, list(values)))
+
+    def close(self):
+        pass
+
+
+def record(path, combined):
+    bus = RecordingBus(SimulatedBus(ADDRESSES, combined=combined), path)
+    array = DisplayArray(ADDRESSES, bus)
+    array.display('42', array.colors['red'])
+    array.display('43', array.colors['blue'])
+    bus.close()
+
+    return bus
+
+
+def test_file_format(tmp_path):
+    path = str(tmp_path / 'writes.r7rc')
+    bus = SimulatedBus([0x3F], combined=False)
+    recording_bus = RecordingBus(bus, path)
+    recording_bus.write_byte_data(0x3F, 0x25, 0)
+    recording_bus.write_i2c_block_data(0x3F, 0x05, [1, 2, 3])
+    recording_bus.close()
+
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    assert data[:HEADER.size] == b'R7RC\x01'
+    assert len(data) == HEADER.size + 2 * RECORD.size + 1 + 3
+
+    first = RECORD.unpack_from(data, HEADER.size)
+    assert first[1:] == (WRITE_BYTE, 0x3F, 0x25, 1)
+
+    second = RECORD.unpack_from(data, HEADER.size + RECORD.size + 1)
+    assert second[1:] == (WRITE_BLOCK, 0x3F, 0x05, 3)
+    assert second[0] >= first[0]
+
+
+@pytest.mark.parametrize('combined', [True, False])
+def test_replay_reproduces_the_ics(tmp_path, combined):
+    path = str(tmp_path / 'writes.r7rc')
+    recorded = record(path, combined).bus
+
+    replayed = SimulatedBus(ADDRESSES, combined=combined)
+    with Recording(path) as recording:
+        count = recording.replay(replayed, speed=None)
+
+    assert count == sum(1 for write in Recording(path))
+    assert replayed.transactions == recorded.transactions
+    for address in ADDRESSES:
+        assert replayed.devices[address].pwm == recorded.devices[address].pwm
+        assert replayed.devices[address].outputs() == recorded.devices[address].outputs()
+
+
+def test_combined_transactions_are_marked(tmp_path):
+    path = str(tmp_path / 'writes.r7rc')
+    record(path, True)
+
+    with Recording(path) as recording:
+        kinds = [kind for timestamp, kind, address, register, payload in recording]
+
+    assert WRITE_CONTINUED in kinds
+    assert kinds[-1] == WRITE_BLOCK  # A combined transaction ends with a plain record
+
+
+def test_a_truncated_recording_is_read_up_to_the_last_whole_record(tmp_path):
+    path = str(tmp_path / 'writes.r7rc')
+    record(path, False)
+
+    with Recording(path) as recording:
+        writes = list(recording)
+
+    with open(path, 'r+b') as f:
+        f.truncate(f.seek(0, 2) - 1)
+
+    with Recording(path) as recording:
+        assert [write[:4] for write in recording] == [write[:4] for write in writes[:-1]]
+
+
+def test_not_a_recording(tmp_path):
+    path = tmp_path / 'writes.r7rc'
+    path.write_bytes(struct.pack('<4sB', b'R7TL', 1))
+
+    with pytest.raises(ValueError):
+        Recording(str(path))
+
+
+def test_raw_smbus(tmp_path):
+    path = str(tmp_path / 'writes.r7rc')
+    smbus = RawSMBus()
+    bus = RecordingBus(smbus, path)
+
+    assert bus.bus_id is None
+    bus.write_messages([(0x3F, 0x05, [1, 2]), (0x3F, 0x25, [0])])
+    bus.close()
+
+    assert smbus.writes == [(0x3F, 0x05, [1, 2]), (0x3F, 0x25, [0])]
+    with Recording(path) as recording:
+        assert [(address, register, list(payload)) for timestamp, kind, address, register, payload in recording] == smbus.writes
+
+
+@pytest.mark.parametrize('combined', [True, False])
+def test_failed_writes_are_not_recorded(tmp_path, combined):
+    path = str(tmp_path / 'writes.r7rc')
+    flaky = FlakyBus([0x3F], combined=combined)
+    bus = RecordingBus(flaky, path)
+
+    flaky.fail.add((0x3F, 0x25))
+    with pytest.raises(IOError):
+        bus.write_messages([(0x3F, 0x05, [1, 2]), (0x3F, 0x25, [0])])
+    bus.write_byte_data(0x3F, 0x06, 9)
+    bus.close()
+
+    with Recording(path) as recording:
+        writes = [(address, register) for timestamp, kind, address, register, payload in recording]
+
+    assert writes[-1] == (0x3F, 0x06)
+    assert (0x3F, 0x25) not in writes
@@ -0,0 +1,146 @@
+import pytest
+
+from conftest import FlakyBus
+from rgb7seg import SimulatedBus
+from rgb7seg.display_array import DisplayArray
+from rgb7seg.is31fl3235a import IS31FL3235A, write_frames
+
+
+def frame(value):
+    return [value] * 28
+
+
+def test_init_turns_every_output_on():
+    bus = SimulatedBus([0x3F])
+    IS31FL3235A(0x3F, bus, buffered=True)
+
+    device = bus.devices[0x3F]
+    assert bus.transactions == 6
+    assert not device.shutdown
+    assert device.outputs() == [0] * 28
+
+
+def test_update_writes_changes_and_latches():
+    bus = SimulatedBus([0x3F], combined=False)
+    ic = IS31FL3235A(0x3F, bus, buffered=True)
+    bus.reset_counters()
+
+    ic[1] = 10
+    ic[2] = 20
+    assert bus.devices[0x3F].outputs() == [0] * 28  # Buffered, nothing written yet
+
+    assert ic.update()
+    assert bus.devices[0x3F].outputs() == [10, 20] + [0] * 26
+    assert bus.transactions == 2  # One block write and the flush
+
+    # Nothing changed, so nothing is written
+    assert not ic.update()
+    assert bus.transactions == 2
+
+
+def test_update_combined_is_one_transaction():
+    bus = SimulatedBus([0x3F])
+    ic = IS31FL3235A(0x3F, bus, buffered=True)
+    bus.reset_counters()
+
+    ic[5] = 255
+    assert ic.update()
+    assert bus.transactions == 1
+    assert bus.devices[0x3F].outputs()[4] == 255
+
+
+def test_update_without_flush_is_latched_by_the_next_update():
+    bus = SimulatedBus([0x3F], combined=False)
+    ic = IS31FL3235A(0x3F, bus, buffered=True)
+
+    ic[1] = 200
+    assert ic.update(flush=False)
+    assert bus.devices[0x3F].pwm[0] == 0  # Written but not live
+
+    assert ic.update()
+    assert bus.devices[0x3F].pwm[0] == 200
+
+
+def test_global_off_inside_frame_is_written_on_exit():
+    bus = SimulatedBus([0x3F])
+    ic = IS31FL3235A(0x3F, bus)
+    bus.reset_counters()
+
+    with ic.frame():
+        ic[1] = 100
+        ic[0] = False
+        assert not bus.devices[0x3F].global_off
+
+    assert bus.transactions == 1
+    assert bus.devices[0x3F].global_off
+    assert bus.devices[0x3F].outputs() == [0] * 28
+
+
+@pytest.mark.parametrize('combined', [True, False])
+def test_display_array_commit_latches_every_numeral(combined):
+    addresses = [0x3C, 0x3D, 0x3E, 0x3F]
+    bus = SimulatedBus(addresses, combined=combined)
+    array = DisplayArray(addresses, bus)
+    bus.reset_counters()
+
+    array.display('1234', array.colors['red'])
+
+    for address in addresses:
+        assert bus.devices[address].flushes == 2  # Setup, then the frame
+        assert any(bus.devices[address].outputs())
+
+    if combined:
+        assert bus.transactions == 1
+
+
+def test_display_array_commit_flushes_the_rest_when_one_flush_fails():
+    addresses = [0x3C, 0x3D]
+    bus = FlakyBus(addresses, combined=False)
+    array = DisplayArray(addresses, bus)
+    red = array.colors['red']
+
+    bus.fail.add((0x3C, 0x25))
+    with pytest.raises(IOError):
+        array.display('88', red)
+
+    assert not any(bus.devices[0x3C].outputs())
+    assert any(bus.devices[0x3D].outputs())
+
+    # The failed numeral is latched on the next commit, even though its registers haven't changed
+    bus.fail.clear()
+    array.commit()
+    assert bus.devices[0x3C].outputs() == bus.devices[0x3D].outputs()
+
+
+@pytest.mark.parametrize('combined', [True, False])
+def test_write_frames(combined):
+    bus = SimulatedBus([0x3E, 0x3F], combined=combined)
+    ics = [IS31FL3235A(address, bus, buffered=True) for address in (0x3E, 0x3F)]
+    bus.reset_counters()
+
+    flushed = write_frames(ics, [frame(1), frame(2)])
+
+    assert flushed == ics
+    assert bus.devices[0x3E].outputs() == frame(1)
+    assert bus.devices[0x3F].outputs() == frame(2)
+    assert bus.transactions == (1 if combined else 4)
+
+    # Only the IC that changed is written
+    flushes = bus.devices[0x3E].flushes
+    assert write_frames(ics, [frame(1), frame(3)]) == ics[1:]
+    assert bus.devices[0x3E].flushes == flushes
+    assert bus.devices[0x3F].outputs() == frame(3)
+
+
+def test_dirty_runs_are_merged_across_small_gaps():
+    bus = SimulatedBus([0x3F], combined=False)
+    ic = IS31FL3235A(0x3F, bus, buffered=True, merge_gap=2)
+    bus.reset_counters()
+
+    values = frame(0)
+    values[0] = values[3] = 50  # Two registers apart, one block write
+    values[20] = 50              # Far away, a second block write
+    ic.write_frame(values)
+
+    assert bus.transactions == 3
+    assert bus.devices[0x3F].pwm == values
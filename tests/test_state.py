@@ -0,0 +1,67 @@
+import pytest
+
+from conftest import FlakyBus
+from rgb7seg.is31fl3235a import IS31FL3235A
+from rgb7seg.state import StateCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = StateCache(str(tmp_path))
+    yield cache
+    cache.close()
+
+
+def test_round_trip(cache):
+    assert cache.load(1, 0x3F) is None
+
+    cache.save(1, 0x3F, True, range(28))
+    assert cache.load(1, 0x3F) == (True, list(range(28)))
+
+    cache.invalidate(1, 0x3F)
+    assert cache.load(1, 0x3F) is None
+
+    cache.save(1, 0x3F, False, [7] * 28)
+    assert cache.load(1, 0x3F) == (False, [7] * 28)
+
+    cache.forget(1, 0x3F)
+    assert cache.load(1, 0x3F) is None
+
+
+def test_warm_attach_skips_the_reset(cache):
+    bus = FlakyBus([0x3F], combined=False)
+    ic = IS31FL3235A(0x3F, bus, buffered=True, state_cache=cache)
+    ic.write_frame([10] * 28)
+
+    bus.reset_counters()
+    attached = IS31FL3235A(0x3F, bus, buffered=True, state_cache=cache)
+
+    assert bus.transactions == 0
+    assert attached.leds[1:] == [10] * 28
+    assert not attached.update()
+
+
+@pytest.mark.parametrize('combined', [True, False])
+def test_failed_write_is_not_attached_to(cache, combined):
+    bus = FlakyBus([0x3F], combined=combined)
+    ic = IS31FL3235A(0x3F, bus, buffered=True, state_cache=cache, merge_gap=0)
+    ic.write_frame([10] * 28)
+
+    # The first run is written, the second fails
+    bus.fail.add((0x3F, ic.pwm_register_start + 20))
+    with pytest.raises(IOError):
+        ic.write_frame([99] * 10 + [10] * 10 + [99] * 8)
+
+    assert cache.load('sim', 0x3F) is None
+
+
+def test_unflushed_write_is_not_attached_to(cache):
+    bus = FlakyBus([0x3F], combined=False)
+    ic = IS31FL3235A(0x3F, bus, buffered=True, state_cache=cache)
+    ic.write_frame([10] * 28)
+
+    ic.write_frame([99] * 28, flush=False)
+    assert cache.load('sim', 0x3F) is None
+
+    ic.flush()
+    assert cache.load('sim', 0x3F) == (True, [99] * 28)
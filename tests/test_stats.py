@@ -0,0 +1,113 @@
+import pytest
+
+from conftest import FlakyBus
+from rgb7seg import SimulatedBus
+from rgb7seg.is31fl3235a import IS31FL3235A
+from rgb7seg.stats import BusStats
+
+
+def test_record_counts_and_buckets():
+    stats = BusStats()
+
+    stats.record('write_block', 30, 0.00004)
+    stats.record('write_block', 30, 0.0003)
+    stats.record('flush', 3, 1.0)
+    stats.record('write_byte', 3, 0.00001, IOError())
+
+    assert stats.transactions == 4
+    assert stats.bytes == 66
+    assert stats.flushes == 1
+    assert stats.errors == 1
+
+    latency = stats.as_dict()['latency']
+    assert latency['write_block']['<=50us'] == 1
+    assert latency['write_block']['<=500us'] == 1
+    assert latency['flush']['>50000us'] == 1
+
+    stats.reset()
+    assert stats.transactions == 0
+    assert stats.as_dict()['latency'] == {}
+
+
+def test_hooks():
+    stats = BusStats()
+    calls = []
+    stats.add_hook(lambda *args: calls.append(args))
+
+    stats.record('flush', 3, 0.001)
+    assert calls == [('flush', 3, 0.001, None)]
+
+    stats.remove_hook(stats.hooks[0])
+    stats.record('flush', 3, 0.001)
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize('fail', [False, True])
+def test_a_failing_hook_doesnt_change_the_write(fail):
+    bus = FlakyBus([0x3F], combined=False)
+    stats = BusStats()
+    ic = IS31FL3235A(0x3F, bus, buffered=True, stats=stats)
+
+    def hook(operation, nbytes, latency, error):
+        raise RuntimeError('exporter is down')
+    stats.add_hook(hook)
+
+    if fail:
+        bus.fail.add((0x3F, ic.pwm_update_register))
+        with pytest.raises(IOError):  # The bus error, not the hook's
+            ic.write_frame([5] * 28)
+    else:
+        assert ic.write_frame([5] * 28)
+        assert ic.shadow == [5] * 28
+
+    assert stats.hook_errors >= 1
+    assert isinstance(stats.hook_error, RuntimeError)
+
+
+def test_ic_writes_are_counted():
+    bus = SimulatedBus([0x3F], combined=False)
+    stats = BusStats()
+    ic = IS31FL3235A(0x3F, bus, buffered=True, stats=stats)
+    stats.reset()
+    bus.reset_counters()
+
+    ic[1] = 10
+    ic[2] = 20
+    ic.update()
+
+    assert stats.transactions == bus.transactions
+    assert stats.bytes == bus.bytes_written
+    assert stats.flushes == 1
+    assert set(stats.histograms) == {'write_block', 'flush'}
+
+
+def test_combined_commit_is_one_transaction():
+    bus = SimulatedBus([0x3F])
+    stats = BusStats()
+    ic = IS31FL3235A(0x3F, bus, buffered=True, stats=stats)
+    stats.reset()
+
+    ic.write_frame([5] * 28)
+
+    assert stats.transactions == 1
+    assert stats.flushes == 1
+    assert set(stats.histograms) == {'commit'}
+
+
+def test_failed_writes_are_retried():
+    bus = FlakyBus([0x3F], combined=False)
+    stats = BusStats()
+    ic = IS31FL3235A(0x3F, bus, stats=stats, retries=2)
+    stats.reset()
+
+    bus.fail.add((0x3F, ic.pwm_update_register))
+    with pytest.raises(IOError):
+        ic.flush()
+
+    assert stats.transactions == 3
+    assert stats.errors == 3
+    assert stats.retries == 2
+
+    bus.fail.clear()
+    ic.flush()
+    assert stats.errors == 3
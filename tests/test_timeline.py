@@ -0,0 +1,82 @@
+import pytest
+
+from rgb7seg import NumberDisplay, SimulatedBus
+from rgb7seg.animation import fade
+from rgb7seg.is31fl3235a import IS31FL3235A
+from rgb7seg.timeline import Timeline
+
+
+@pytest.fixture
+def numeral():
+    numeral = NumberDisplay(i2c_bus=SimulatedBus([0x3F]), ic_address=0x3F)
+    numeral.set_character(8)
+    return numeral
+
+
+def test_compile_renders_without_writing(numeral):
+    bus = numeral.hsv7seg.is31fl3235a.i2c_bus
+    leds = list(numeral.hsv7seg.is31fl3235a.leds)
+    bus.reset_counters()
+
+    timeline = Timeline.compile(numeral, fade((0, 1, 0), (0, 1, 1), duration=1, fps=10), fps=10)
+
+    assert len(timeline) == 11
+    assert bus.transactions == 0
+    assert numeral.hsv7seg.is31fl3235a.leds == leds
+    assert not any(timeline.frame(0))
+    assert max(timeline.frame(10)) == 255
+
+
+def test_compile_limits_endless_effects(numeral):
+    def forever():
+        while True:
+            yield (0, 1, 1)
+
+    assert len(Timeline.compile(numeral, forever(), frames=3)) == 3
+
+
+def test_save_and_load(numeral, tmp_path):
+    timeline = Timeline.compile(numeral, fade((0, 1, 0), (0.5, 1, 1), duration=1, fps=5), fps=5)
+    path = str(tmp_path / 'fade.r7tl')
+
+    timeline.save(path)
+    loaded = Timeline.load(path)
+
+    assert loaded.fps == 5
+    assert loaded.frames == timeline.frames
+
+
+def test_load_refuses_other_files(tmp_path):
+    path = tmp_path / 'junk'
+    path.write_bytes(b'\0' * 32)
+
+    with pytest.raises(ValueError):
+        Timeline.load(str(path))
+
+
+def test_frames_must_be_whole():
+    with pytest.raises(ValueError):
+        Timeline(bytes(27))
+
+
+def test_play_leaves_the_last_frame_on_the_ic(numeral):
+    ic = numeral.hsv7seg.is31fl3235a
+    bus = ic.i2c_bus
+    timeline = Timeline.from_registers([[value] * 28 for value in (1, 2, 3)], fps=1000)
+
+    assert timeline.play(ic) >= 0
+
+    assert bus.devices[0x3F].outputs() == [3] * 28
+    assert ic.leds[1:] == [3] * 28
+    assert not ic.update()  # The driver knows what the IC holds
+
+
+def test_late_playback_still_writes_the_last_frame(numeral):
+    bus = SimulatedBus([0x3F], speed=2000, sleep=True)  # About 35ms a frame
+    ic = IS31FL3235A(0x3F, bus, buffered=True)
+    timeline = Timeline.compile(numeral, fade((0, 1, 1), (0, 1, 0), duration=0.2, fps=100), fps=100)
+
+    assert timeline.play(ic) > 0
+
+    assert not any(bus.devices[0x3F].outputs())
+    assert not any(ic.leds[1:])
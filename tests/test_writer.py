@@ -0,0 +1,109 @@
+import threading
+
+import pytest
+
+from rgb7seg import SimulatedBus
+from rgb7seg.is31fl3235a import IS31FL3235A
+from rgb7seg.number_display import NumberDisplay
+from rgb7seg.writer import FrameWriter
+
+
+class GatedBus(SimulatedBus):
+    """A SimulatedBus whose writes wait until `self.gate` is set, and signal `self.started` when one begins.
+    """
+    def __init__(self, *args, **kwargs):
+        SimulatedBus.__init__(self, *args, **kwargs)
+        self.gate = threading.Event()
+        self.gate.set()
+        self.started = threading.Event()
+
+    def _transfer(self, address, register, data):
+        self.started.set()
+        self.gate.wait()
+        SimulatedBus._transfer(self, address, register, data)
+
+
+def test_only_the_newest_frame_is_written():
+    bus = GatedBus([0x3F], combined=False)
+    writer = FrameWriter(IS31FL3235A(0x3F, bus, buffered=True))
+    bus.gate.clear()
+    bus.started.clear()
+
+    writer.post([1] * 28)
+    assert bus.started.wait(5)  # The writer is stuck on the bus with the first frame
+
+    for value in range(2, 10):
+        writer.post([value] * 28)
+
+    bus.gate.set()
+    assert writer.flush(timeout=5)
+
+    assert writer.posted == 9
+    assert writer.written == 2
+    assert writer.coalesced == 7
+    assert bus.devices[0x3F].pwm == [9] * 28
+    writer.close()
+
+
+def test_write_errors_are_raised_by_the_next_post():
+    bus = SimulatedBus([0x3F])
+    writer = FrameWriter(IS31FL3235A(0x3F, bus, buffered=True))
+    bus.devices.clear()
+
+    writer.post([1] * 28)
+    with writer._condition:
+        assert writer._condition.wait_for(lambda: writer.error is not None, 5)
+
+    with pytest.raises(IOError):
+        writer.post([2] * 28)
+    writer.close()
+
+
+def test_flush_raises_and_retries_a_failed_frame():
+    bus = SimulatedBus([0x3F])
+    writer = FrameWriter(IS31FL3235A(0x3F, bus, buffered=True))
+    device = bus.devices.pop(0x3F)
+
+    writer.post([1] * 28)
+    with pytest.raises(IOError):
+        writer.flush(timeout=5)
+    with pytest.raises(IOError):
+        writer.flush(timeout=5)  # Retried, and still nothing answers
+
+    bus.devices[0x3F] = device
+    assert writer.flush(timeout=5)
+    assert device.pwm == [1] * 28
+    writer.close()
+
+
+def test_close_raises_when_the_last_frame_fails():
+    bus = SimulatedBus([0x3F])
+    numeral = NumberDisplay(i2c_bus=bus, ic_address=0x3F, nonblocking=True)
+    bus.devices.clear()
+
+    numeral.display(8)
+    with pytest.raises(IOError):
+        numeral.close()
+
+
+def test_close_writes_the_pending_frame():
+    bus = SimulatedBus([0x3F], speed=1000, sleep=True)  # Slow enough that the frame is still pending
+    numeral = NumberDisplay(i2c_bus=bus, ic_address=0x3F, nonblocking=True)
+
+    numeral.display(1)
+    numeral.close()
+
+    assert numeral.writer.written == 1
+    assert not numeral.writer._thread.is_alive()
+    assert sum(1 for value in bus.devices[0x3F].outputs() if value) == 6  # Two segments, three LEDs each
+
+
+def test_flush_waits_for_the_latest_frame():
+    bus = SimulatedBus([0x3F])
+    numeral = NumberDisplay(i2c_bus=bus, ic_address=0x3F, nonblocking=True)
+
+    numeral.display(8)
+    assert numeral.flush(timeout=5)
+    assert bus.devices[0x3F].pwm == numeral.hsv7seg.is31fl3235a.leds[1:]
+
+    numeral.close()